@@ -0,0 +1,276 @@
+import os
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+
+STAGES = ["ingestion", "aggregation", "reconciliation", "output"]
+DATE_COLUMNS = ("Month", "Date Post")
+METRIC_COLUMNS = [source_col for source_col, _, _ in pipeline.RECONCILE_METRICS]
+REFERENCE_COLUMNS = [reference_col for _, reference_col, _ in pipeline.RECONCILE_METRICS]
+WORK_DIR_MARKER = ".benchmark_work"  # Marks a --work-dir the benchmark created and may delete
+
+@contextmanager
+def measure_stage(results, stage):
+    """Times a stage and samples its peak RSS; the caller sets stats["rows"] inside the block.
+
+    Peak RSS is for this process only; memory used by reader pool workers
+    is not included.
+    """
+    stats = {"rows": 0}
+    start = time.perf_counter()
+    with pipeline.track_peak_rss() as memory:
+        yield stats
+    seconds = time.perf_counter() - start
+
+    totals = results.setdefault(stage, {"seconds": 0.0, "rows": 0, "peak_rss_bytes": None})
+    totals["seconds"] += seconds
+    totals["rows"] += stats["rows"]
+    if memory["peak_rss_bytes"] is not None:
+        totals["peak_rss_bytes"] = max(totals["peak_rss_bytes"] or 0, memory["peak_rss_bytes"])
+
+def benchmark_systems(config):
+    """Returns the configured systems whose columns cover every reconciled metric."""
+    return [
+        system_name for system_name, system_config in config["systems"].items()
+        if set(METRIC_COLUMNS) <= set(system_config["columns"].values())
+    ]
+
+def period_label(system_config, year, month):
+    """Returns the Month/Date Post value a system's summary will carry for a month."""
+    return pd.Timestamp(year=year, month=month, day=1).strftime(system_config.get("date_format", "%Y-%m"))
+
+def generate_source_tree(root_directory, config, system_names, practitioners=20, months=3, rows_per_file=500, width=30, file_format="xlsx", start="2025-01", seed=0):
+    """Writes a synthetic SourceSystem/<system>/<practitioner>/<file> tree.
+
+    Each practitioner gets one file per month with rows_per_file rows. Files
+    use the raw headers from the system's column mapping plus filler columns
+    up to width columns. Returns {(Matchkey, metric): true total} for
+    building the reference workbook, and the number of rows written.
+    """
+    rng = np.random.default_rng(seed)
+    first_month = pd.Period(start, freq="M")
+    totals = {}
+    rows_written = 0
+
+    for system_name in system_names:
+        system_config = config["systems"][system_name]
+        column_mapping = system_config["columns"]
+        filler_columns = [f"Filler {index}" for index in range(max(0, width - len(column_mapping)))]
+
+        for practitioner_index in range(practitioners):
+            practitioner = f"{system_name.title()} Practitioner {practitioner_index:03d}"
+            folder_path = os.path.join(root_directory, system_name, practitioner)
+            os.makedirs(folder_path, exist_ok=True)
+
+            for month_offset in range(months):
+                period = first_month + month_offset
+                label = period_label(system_config, period.year, period.month)
+                data = {}
+                for raw_col, new_col in column_mapping.items():
+                    if new_col in DATE_COLUMNS:
+                        if "date_format" in system_config:
+                            days = rng.integers(1, period.days_in_month + 1, rows_per_file)
+                            data[raw_col] = pd.to_datetime([f"{period}-{day:02d}" for day in days])
+                        else:
+                            data[raw_col] = [label] * rows_per_file  # Used as-is when no date_format is set
+                    elif new_col in METRIC_COLUMNS:
+                        data[raw_col] = rng.normal(250, 120, rows_per_file).round(2)
+                    else:
+                        data[raw_col] = [practitioner] * rows_per_file
+                for filler_col in filler_columns:
+                    data[filler_col] = rng.random(rows_per_file)
+                df = pd.DataFrame(data)
+
+                file_path = os.path.join(folder_path, f"{system_name}_{period}.{file_format}")
+                if file_format == "xlsx":
+                    df.to_excel(file_path, index=False, engine="openpyxl")
+                elif file_format == "csv":
+                    df.to_csv(file_path, index=False)
+                else:
+                    raise ValueError(f"Unknown file format '{file_format}', expected 'xlsx' or 'csv'")
+                rows_written += rows_per_file
+
+                for raw_col, new_col in column_mapping.items():
+                    if new_col in METRIC_COLUMNS:
+                        key = (f"{practitioner}_{label}", new_col)
+                        totals[key] = totals.get(key, 0.0) + float(df[raw_col].sum())
+
+    return totals, rows_written
+
+def generate_reference(file_path, totals, mismatch_rate=0.1, seed=0):
+    """Writes a reference workbook with a Matchkey row per practitioner-month.
+
+    Reference values equal the generated totals except for a mismatch_rate
+    share of keys, which are shifted by 50%.
+    """
+    rng = np.random.default_rng(seed)
+    matchkeys = sorted({matchkey for matchkey, _ in totals})
+    rows = []
+    for matchkey in matchkeys:
+        factor = 1.5 if rng.random() < mismatch_rate else 1.0
+        row = {"Matchkey": matchkey}
+        for source_col, reference_col in zip(METRIC_COLUMNS, REFERENCE_COLUMNS):
+            row[reference_col] = round(totals.get((matchkey, source_col), 0.0) * factor, 2)
+        rows.append(row)
+    pd.DataFrame(rows).to_excel(file_path, index=False, engine="openpyxl")
+
+def benchmark_config(config, work_directory, system_names, max_workers=None):
+    """Returns a copy of config pointed at the synthetic tree and scratch folders."""
+    config = copy.deepcopy(config)
+    config["systems"] = {system_name: config["systems"][system_name] for system_name in system_names}
+    config["root_directory"] = os.path.join(work_directory, "SourceSystem")
+    config["reference_cache_folder"] = os.path.join(work_directory, ".reference_cache")
+    config["incremental"] = False
+    for system_name, system_config in config["systems"].items():
+        system_config["staging_folder"] = os.path.join(work_directory, "Staging", system_name)
+        system_config.pop("incremental", None)
+        if max_workers is not None:
+            system_config["max_workers"] = max_workers
+    if max_workers is not None:
+        config["max_workers"] = max_workers
+    return config
+
+def run_benchmark(config, reference_file, output_directory, rows_per_file):
+    """Runs each pipeline stage for every system and returns per-stage results.
+
+    Ingestion rows are counted from the generated files, since streaming
+    systems hand back partial aggregates rather than raw rows.
+    """
+    results = {}
+    reconciled_by_system = {}
+
+    for system_name, system_config in config["systems"].items():
+        max_workers = system_config.get("max_workers", config.get("max_workers", 1))
+        discovery_workers = system_config.get("discovery_workers", config.get("discovery_workers", 1))
+        root_directory = os.path.join(config["root_directory"], system_name)
+
+        with measure_stage(results, "ingestion") as stats:
+            source_files = pipeline.list_source_files(root_directory, system_config, discovery_workers)
+            all_data, errors = pipeline.read_source_files(source_files, system_config, max_workers)
+            stats["rows"] = len(source_files) * rows_per_file
+        for file_path, message in errors:
+            print(f"Warning: {file_path}: {message}")
+
+        with measure_stage(results, "aggregation") as stats:
+            summary_df = pipeline.summarize_system_data(all_data, system_config)
+            stats["rows"] = len(summary_df)
+        del all_data
+
+        with measure_stage(results, "reconciliation") as stats:
+            reference_df = pipeline.load_reference(reference_file, config["reference_cache_folder"])
+            reconciled_by_system[system_name] = pipeline.process_excel_files(summary_df, reference_df, config)
+            stats["rows"] = len(reconciled_by_system[system_name])
+
+    with measure_stage(results, "output") as stats:
+        final_combined_df = pd.concat(reconciled_by_system.values(), ignore_index=True)
+        output_path = os.path.join(output_directory, "benchmark_reconciliation.xlsx")
+        pipeline.write_combined_output(final_combined_df, reconciled_by_system, output_path, config.get("output", {}))
+        stats["rows"] = len(final_combined_df)
+
+    for totals in results.values():
+        totals["rows_per_second"] = totals["rows"] / totals["seconds"] if totals["seconds"] else None
+    return results
+
+def compare_to_baseline(results, baseline):
+    """Prints the change in wall time and peak RSS for each stage against a baseline."""
+    print("Stage            seconds  baseline    change   peak MB  baseline")
+    for stage in STAGES:
+        current = results.get(stage)
+        previous = baseline.get("results", {}).get(stage)
+        if current is None or previous is None:
+            continue
+        change = (current["seconds"] - previous["seconds"]) / previous["seconds"] * 100 if previous["seconds"] else 0.0
+        current_mb = (current["peak_rss_bytes"] or 0) / 1e6
+        previous_mb = (previous["peak_rss_bytes"] or 0) / 1e6
+        print(f"{stage:<15} {current['seconds']:8.2f} {previous['seconds']:9.2f} {change:+8.1f}% {current_mb:9.1f} {previous_mb:9.1f}")
+
+def print_results(results):
+    """Prints per-stage wall time, rows/sec and peak RSS."""
+    print("Stage            seconds       rows     rows/sec   peak MB")
+    for stage in STAGES:
+        if stage in results:
+            totals = results[stage]
+            peak_mb = (totals["peak_rss_bytes"] or 0) / 1e6
+            print(f"{stage:<15} {totals['seconds']:8.2f} {totals['rows']:10d} {totals['rows_per_second'] or 0:12.0f} {peak_mb:9.1f}")
+
+def parse_args(argv=None):
+    """Parses the benchmark command line."""
+    parser = argparse.ArgumentParser(description="Benchmark the standardize and reconcile pipeline on synthetic data.")
+    parser.add_argument("--config", default="test_config.json", help="Config whose system column layouts are generated")
+    parser.add_argument("--work-dir", default="benchmark_work", help="Scratch folder for the synthetic tree and outputs; replaced on each run unless --reuse-data, so it must be empty or a previous benchmark folder")
+    parser.add_argument("--practitioners", type=int, default=20, help="Practitioners per system")
+    parser.add_argument("--months", type=int, default=3, help="Months per practitioner (one file each)")
+    parser.add_argument("--rows", type=int, default=500, help="Rows per source file")
+    parser.add_argument("--width", type=int, default=30, help="Columns per source file, including filler columns")
+    parser.add_argument("--format", choices=["xlsx", "csv"], default="xlsx", help="Source file format")
+    parser.add_argument("--workers", type=int, default=None, help="Override max_workers for ingestion")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reuse-data", action="store_true", help="Keep an existing synthetic tree instead of regenerating it")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="Baseline results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--report", default=None, help="Write this run's results as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Generates synthetic data, runs the pipeline stages and reports timings."""
+    args = parse_args(argv)
+    config = pipeline.load_config(args.config)
+    system_names = benchmark_systems(config)
+    parameters = {
+        "systems": system_names,
+        "practitioners": args.practitioners,
+        "months": args.months,
+        "rows": args.rows,
+        "width": args.width,
+        "format": args.format,
+        "workers": args.workers,
+        "seed": args.seed,
+    }
+
+    source_root = os.path.join(args.work_dir, "SourceSystem")
+    reference_file = os.path.join(args.work_dir, "reference.xlsx")
+    if not (args.reuse_data and os.path.exists(reference_file)):
+        if os.path.isdir(args.work_dir) and os.listdir(args.work_dir) and not os.path.exists(os.path.join(args.work_dir, WORK_DIR_MARKER)):
+            print(f"Error: {args.work_dir} is not empty and was not created by the benchmark; pick another --work-dir.")
+            return 1
+        shutil.rmtree(args.work_dir, ignore_errors=True)
+        os.makedirs(args.work_dir)
+        open(os.path.join(args.work_dir, WORK_DIR_MARKER), "w").close()
+        print(f"Generating synthetic data in {args.work_dir} ...")
+        totals, rows_written = generate_source_tree(
+            source_root, config, system_names, args.practitioners, args.months, args.rows, args.width, args.format, seed=args.seed
+        )
+        generate_reference(reference_file, totals, seed=args.seed)
+        print(f"Generated {rows_written} rows across {len(system_names)} system(s)")
+
+    results = run_benchmark(benchmark_config(config, args.work_dir, system_names, args.workers), reference_file, args.work_dir, args.rows)
+    print_results(results)
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        if baseline.get("parameters") != parameters:
+            print(f"Warning: baseline in {args.baseline} was recorded with different parameters")
+        compare_to_baseline(results, baseline)
+
+    run = {"parameters": parameters, "results": results, "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(run, file, indent=4)
+        print(f"Baseline saved in: {args.baseline}")
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(run, file, indent=4)
+        print(f"Benchmark report saved in: {args.report}")
+
+if __name__ == "__main__":
+    sys.exit(main())
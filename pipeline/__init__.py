@@ -0,0 +1,32 @@
+"""Standardize source system exports and reconcile them against reference files.
+
+Run it with ``python -m pipeline`` (see ``python -m pipeline --help``) or
+call the functions below from other scripts.
+"""
+from .config import load_config
+from .instrumentation import current_rss, timed_stage, track_peak_rss
+from .discovery import get_correct_parent_folder, list_source_files, path_fields
+from .readers import SOURCE_READERS, apply_filters, compile_filters, normalize_dates
+from .aggregation import compact_dtypes, summarize_system_data, summary_keys
+from .ingest import iter_source_results, read_source_file, read_source_files, read_source_files_incremental
+from .staging import load_partitions, parse_period_range, read_lineage_index, read_staging_file, write_partitions, write_staging_file
+from .reconcile import RECONCILE_METRICS, explain_key, fuzzy_match_keys, load_reference, print_explanation, process_excel_files
+from .output import REFERENCE_FILE, RECONCILED_OUTPUT_PATH, STANDARDIZED_OUTPUT_PATH, reference_label, write_combined_output, write_excel_output, write_outputs
+from .runner import process_system_data, reconcile_references, reconcile_stored_periods, run_all_systems, run_system_pipeline
+from .watch import watch_sources
+from .cli import main, parse_args
+
+__all__ = [
+    "load_config",
+    "current_rss", "timed_stage", "track_peak_rss",
+    "get_correct_parent_folder", "list_source_files", "path_fields",
+    "SOURCE_READERS", "apply_filters", "compile_filters", "normalize_dates",
+    "compact_dtypes", "summarize_system_data", "summary_keys",
+    "iter_source_results", "read_source_file", "read_source_files", "read_source_files_incremental",
+    "load_partitions", "parse_period_range", "read_lineage_index", "read_staging_file", "write_partitions", "write_staging_file",
+    "RECONCILE_METRICS", "explain_key", "fuzzy_match_keys", "load_reference", "print_explanation", "process_excel_files",
+    "REFERENCE_FILE", "RECONCILED_OUTPUT_PATH", "STANDARDIZED_OUTPUT_PATH", "reference_label", "write_combined_output", "write_excel_output", "write_outputs",
+    "process_system_data", "reconcile_references", "reconcile_stored_periods", "run_all_systems", "run_system_pipeline",
+    "watch_sources",
+    "main", "parse_args",
+]
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# How each streamable aggregation is computed per file, and how the per-file
+# partials are merged. "mean" is carried as a sum and a count.
+STREAMING_AGGREGATIONS = {
+    "sum": "sum",
+    "count": "sum",
+    "size": "sum",
+    "min": "min",
+    "max": "max",
+    "first": "first",
+    "last": "last",
+}
+
+def summary_keys(system_config):
+    """Returns the summary group keys: Practitioner Name plus Month or Date Post."""
+    targets = set(system_config["columns"].values())
+    date_column = "Date Post" if "Date Post" in targets and "Month" not in targets else "Month"
+    return ["Practitioner Name", date_column]
+
+def categorize_keys(df, system_config):
+    """Converts the summary key columns of a per-file frame to categoricals (compact_dtypes at read time)."""
+    for col in summary_keys(system_config):
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+def concat_frames(frames):
+    """Concatenates frames, keeping columns that are categorical in every frame categorical.
+
+    Categories are unioned and sorted first, since pd.concat falls back to
+    object for categoricals that differ, and sorted categories keep the
+    groupby order of plain strings.
+    """
+    frames = list(frames)
+    for col in {col for df in frames for col in df.columns}:
+        if all(col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames):
+            categories = union_categoricals([df[col] for df in frames], sort_categories=True).categories
+            frames = [df.assign(**{col: df[col].cat.set_categories(categories)}) for df in frames]
+    return pd.concat(frames, ignore_index=True)
+
+def _streaming_functions(df, system_config):
+    """Returns the aggregate_functions to stream (sum of every non-key column if unset)."""
+    keys = summary_keys(system_config)
+    if "aggregate_functions" in system_config:
+        return system_config["aggregate_functions"]
+    return {col: "sum" for col in df.columns if col not in keys}
+
+def partial_aggregate(df, system_config):
+    """Reduces one file's rows to partial aggregates per summary key."""
+    keys = summary_keys(system_config)
+    aggregate_functions = _streaming_functions(df, system_config)
+    for col in keys + list(aggregate_functions):
+        if col not in df.columns:
+            df[col] = np.nan  # Same as the NaN fill pd.concat gives a file missing the column
+
+    partial = {}
+    for col, func in aggregate_functions.items():
+        if func == "mean":
+            partial[col + "__sum"] = (col, "sum")
+            partial[col + "__count"] = (col, "count")
+        elif func in STREAMING_AGGREGATIONS:
+            partial[col] = (col, func)
+        else:
+            raise ValueError(f"Aggregation '{func}' for {col} cannot be streamed, expected one of {list(STREAMING_AGGREGATIONS) + ['mean']}")
+    return df.groupby(keys, as_index=False, observed=True).agg(**partial)
+
+def combine_partials(partials, system_config):
+    """Merges partial aggregates produced by partial_aggregate into one partial."""
+    keys = summary_keys(system_config)
+    combined = concat_frames(partials)
+    combine_functions = {}
+    for col in combined.columns:
+        if col in keys:
+            continue
+        if col.endswith(("__sum", "__count")):
+            combine_functions[col] = "sum"
+        else:
+            combine_functions[col] = STREAMING_AGGREGATIONS[_streaming_functions(combined, system_config)[col]]
+    return combined.groupby(keys, as_index=False, observed=True).agg(combine_functions)
+
+def finalize_partials(combined, system_config):
+    """Turns merged partials into the summary frame (resolving mean columns)."""
+    keys = summary_keys(system_config)
+    aggregate_functions = system_config.get("aggregate_functions")
+    if aggregate_functions is None:
+        return combined
+    summary_df = combined[keys].copy()
+    for col, func in aggregate_functions.items():
+        if func == "mean":
+            summary_df[col] = combined[col + "__sum"] / combined[col + "__count"]
+        else:
+            summary_df[col] = combined[col]
+    return summary_df
+
+def summarize_system_data(all_data, system_config):
+    """Builds the per-system summary from the frames returned by the readers."""
+    if system_config.get("streaming_aggregation", False):
+        return finalize_partials(combine_partials(all_data, system_config), system_config)
+
+    final_df = concat_frames(all_data)
+    if "aggregate_functions" in system_config:
+        return final_df.groupby(summary_keys(system_config), as_index=False, observed=True).agg(system_config["aggregate_functions"])
+    elif "Month" in final_df.columns:
+        return final_df.groupby(["Practitioner Name", "Month"], as_index=False, observed=True).sum()
+    return final_df
+
+# Low-cardinality text columns carried as categoricals by compact_dtypes
+CATEGORICAL_COLUMNS = ("Practitioner Name", "Source System", "Month", "Date Post")
+
+def compact_dtypes(df):
+    """Returns df with categorical text keys and numeric columns downcast where lossless.
+
+    Integers shrink to the smallest type holding their range; floats become
+    float32 only when every value survives the round trip, so amounts are
+    never rounded.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORICAL_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            df[col] = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            downcast = series.astype(np.float32)
+            if np.array_equal(downcast.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+                df[col] = downcast
+    return df
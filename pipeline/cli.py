@@ -0,0 +1,136 @@
+import json
+import time
+import argparse
+import cProfile
+import tracemalloc
+import pandas as pd
+
+from .config import load_config
+from .instrumentation import timed_stage
+from .staging import parse_period_range
+from .reconcile import explain_key, load_reference, print_explanation
+from .output import REFERENCE_FILE, reference_label, write_outputs
+from .runner import reconcile_stored_periods, run_all_systems
+from .watch import watch_sources
+
+def parse_args(argv=None):
+    """Parses the command line for main()."""
+    parser = argparse.ArgumentParser(description="Standardize source system exports and reconcile them against one or more reference files.")
+    parser.add_argument("--config", default="test_config.json", help="Path to the JSON config")
+    parser.add_argument("--report", default=None, help="Write the JSON run report here (overrides run_report)")
+    parser.add_argument("--cprofile", default=None, help="Profile the run with cProfile into this file (overrides profile.cprofile)")
+    parser.add_argument("--tracemalloc", action="store_true", help="Trace Python allocations and add the top sites to the run report")
+    parser.add_argument("--period", default=None, help='Reconcile only this month or range ("2025-01", "2025-01:2025-03") from the staging store (overrides reconcile_periods)')
+    parser.add_argument("--explain", default=None, metavar="KEY", help='Explain a reconciliation key ("Dr A_2025-01") from the lineage index and exit')
+    parser.add_argument("--watch", action="store_true", help="Keep running and refresh the outputs as source files change (see the watch config)")
+    parser.add_argument("--reference", action="append", default=None, metavar="FILE", help="Reconcile against this reference file; repeat to reconcile one ingest against several (overrides reference_files)")
+    parser.add_argument("--standardize-only", action="store_true", help="Only write the per-system staging summaries; skip reconciliation and the combined outputs")
+    return parser.parse_args(argv)
+
+def write_run_report(report, report_path):
+    """Writes the run report as JSON."""
+    with open(report_path, "w") as file:
+        json.dump(report, file, indent=4, default=str)
+
+def main(argv=None):
+    """Main function to standardize data and then perform reconciliation."""
+    args = parse_args(argv)
+    config_path = args.config
+    config = load_config(config_path)
+    reference_files = [] if args.standardize_only else args.reference or config.get("reference_files", [REFERENCE_FILE])
+    if (args.explain or args.watch) and len(reference_files) > 1:
+        print(f"Error: --{'explain' if args.explain else 'watch'} works against one reference file, got {len(reference_files)}; pass the one to use with --reference.")
+        return
+    if args.explain:
+        print_explanation(explain_key(config, args.explain, reference_files[0] if reference_files else REFERENCE_FILE), args.explain)
+        return
+    if args.watch:
+        watch_config = config.get("watch", {})
+        watch_sources(config, reference_files[0] if reference_files else REFERENCE_FILE, watch_config.get("interval", 5), watch_config.get("settle_seconds", 2))
+        return
+
+    profile_config = config.setdefault("profile", {})
+    if args.cprofile:
+        profile_config["cprofile"] = args.cprofile
+    if args.tracemalloc:
+        profile_config["tracemalloc"] = True
+    report_path = args.report or config.get("run_report")
+    period = args.period or config.get("reconcile_periods")
+    period_range = parse_period_range(period) if period else None
+    if period_range is not None and not config.get("staging_store"):
+        print("Error: reconciling a period needs staging_store set in the config.")
+        return
+
+    run_report = {"config": config_path, "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "stages": {}, "systems": {}}
+    run_start = time.perf_counter()
+    profiler = None
+    if profile_config.get("cprofile"):
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if profile_config.get("tracemalloc"):
+        tracemalloc.start()
+    
+    all_errors = []  # (file_path, message) for every file that failed to load
+
+    references = {}  # Each parsed once, shared by every system
+    with timed_stage(run_report, "reference") as stats:
+        for reference_file in reference_files:
+            references[reference_label(reference_file)] = load_reference(reference_file, config.get("reference_cache_folder"))
+        stats["rows"] = sum(len(reference_df) for reference_df in references.values())
+    if len(references) < len(reference_files):
+        print("Error: reference files need distinct file names, their outputs are named after them.")
+        return
+    run_report["references"] = reference_files
+
+    standardized_by_system = {}  # Per-system frames for sheet_per_system output
+    reconciled_by_reference = {label: {} for label in references}
+    output_config = config.get("output", {})
+    output_suffix = ""
+
+    if period_range is not None:
+        # Reconcile stored periods only; sources are not read
+        with timed_stage(run_report, "systems"):
+            standardized_by_system, reconciled_by_reference = reconcile_stored_periods(config, references, period_range, run_report["systems"])
+        output_suffix = "_" + "_".join(dict.fromkeys(month or "open" for month in period_range))
+    else:
+        with timed_stage(run_report, "systems"):
+            system_results = run_all_systems(config, references)
+        for system_name, (standardized_data, reconciled_by_label, errors, system_report) in zip(config["systems"], system_results):
+            all_errors.extend(errors)
+            run_report["systems"][system_name] = system_report
+            if standardized_data:
+                standardized_by_system[system_name] = pd.concat(standardized_data, ignore_index=True)
+            for label, reconciled_df in reconciled_by_label.items():
+                reconciled_by_reference[label][system_name] = reconciled_df
+    
+    if args.standardize_only:
+        standardized_by_system = {}  # Per-system staging files only, as the standardization scripts always wrote
+    with timed_stage(run_report, "output") as stats:
+        write_outputs(standardized_by_system, reconciled_by_reference, output_config, stats, output_suffix)
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(profile_config["cprofile"])
+        run_report["cprofile"] = profile_config["cprofile"]
+    if profile_config.get("tracemalloc"):
+        current, peak = tracemalloc.get_traced_memory()
+        top_sites = tracemalloc.take_snapshot().statistics("lineno")[:10]
+        tracemalloc.stop()
+        run_report["tracemalloc"] = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top_sites": [{"site": str(stat.traceback), "bytes": stat.size, "count": stat.count} for stat in top_sites],
+        }
+    run_report["seconds"] = round(time.perf_counter() - run_start, 6)
+    run_report["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    run_report["errors"] = [{"path": file_path, "message": message} for file_path, message in all_errors]
+
+    if report_path:
+        write_run_report(run_report, report_path)
+        print(f"Run report saved in: {report_path}")
+        if all_errors:
+            print(f"{len(all_errors)} file(s) could not be processed, see the run report")
+    elif all_errors:
+        print(f"{len(all_errors)} file(s) could not be processed:")
+        for file_path, message in all_errors:
+            print(f"  {file_path}: {message}")
@@ -0,0 +1,6 @@
+import json
+
+def load_config(config_path):
+    """Loads the JSON configuration file."""
+    with open(config_path, "r") as file:
+        return json.load(file)
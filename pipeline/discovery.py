@@ -0,0 +1,103 @@
+import os
+import fnmatch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .readers import SOURCE_READERS
+
+def get_correct_parent_folder(folder_path):
+    """Returns the folder just before the last one in the given path."""
+    return os.path.basename(os.path.dirname(os.path.normpath(folder_path))) or None
+
+DEFAULT_LAYOUT = "{system}/{practitioner}/{file}"
+
+_STAT_CACHE = {}  # file path -> os.stat_result from the latest discovery walk
+_STAT_CACHE_LOCK = threading.Lock()
+
+def layout_segments(system_config):
+    """Splits a system's layout ("{system}/{practitioner}/{file}") into path segments."""
+    return [segment for segment in system_config.get("layout", DEFAULT_LAYOUT).replace("\\", "/").split("/") if segment]
+
+def path_fields(file_path, system_config):
+    """Maps the trailing components of file_path to the named layout segments.
+
+    The last segment matches the file name, the one before it the file's
+    folder, and so on; "*" or literal segments are not captured. With the
+    default layout, {practitioner} is the file's folder and {system} the
+    folder above it.
+    """
+    segments = layout_segments(system_config)
+    parts = os.path.normpath(file_path).split(os.sep)[-len(segments):]
+    return {
+        segment[1:-1]: part
+        for segment, part in zip(segments[-len(parts):], parts)
+        if segment.startswith("{") and segment.endswith("}")
+    }
+
+def _matches_patterns(relative_path, patterns):
+    """True when the file name (or, for patterns with "/", the relative path) matches a pattern."""
+    name = relative_path.rsplit("/", 1)[-1].lower()
+    return any(fnmatch.fnmatchcase(relative_path.lower() if "/" in pattern else name, pattern.lower()) for pattern in patterns)
+
+def _scan_directory(directory):
+    """Returns (sub-directories, [(name, path, stat)] files) for one directory via os.scandir."""
+    directories = []
+    files = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                directories.append(entry.path)
+            elif entry.is_file():
+                files.append((entry.name, entry.path, entry.stat()))  # Free on Windows, where it comes with the listing
+    return directories, files
+
+def list_source_files(root_directory, system_config=None, workers=1):
+    """Returns (folder_path, file_path) pairs for every source file, in a stable order.
+
+    Walks root_directory (one system's folder) with os.scandir, one level at
+    a time; with workers > 1 the directories of a level are scanned in
+    parallel threads. Files are taken from the depth the system's layout
+    describes (one folder level for the default layout) down to max_depth,
+    and must match file_patterns (default: every readable extension).
+    Temporary "~$" files are skipped. The stat results of the walk are kept
+    for source_stat.
+    """
+    system_config = system_config or {}
+    min_depth = len(layout_segments(system_config)) - 1  # Levels below the system folder
+    max_depth = max(system_config.get("max_depth", min_depth), min_depth)
+    patterns = system_config.get("file_patterns", ["*" + extension for extension in SOURCE_READERS])
+
+    found = []
+    stats = {}
+    level = [root_directory]
+    depth = 1
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while level and depth <= max_depth:
+            scans = executor.map(_scan_directory, level) if workers > 1 and len(level) > 1 else map(_scan_directory, level)
+            next_level = []
+            for directory, (directories, files) in zip(level, scans):
+                next_level.extend(directories)
+                if depth < min_depth:
+                    continue
+                for name, path, stat in files:
+                    relative_path = os.path.relpath(path, root_directory).replace(os.sep, "/")
+                    if name.startswith("~$") or os.path.splitext(name)[1].lower() not in SOURCE_READERS:
+                        continue
+                    if _matches_patterns(relative_path, patterns):
+                        found.append((tuple(relative_path.split("/")), directory, path))
+                        stats[path] = stat
+            level = next_level
+            depth += 1
+
+    with _STAT_CACHE_LOCK:
+        prefix = os.path.join(root_directory, "")
+        for path in [path for path in _STAT_CACHE if path.startswith(prefix) and path not in stats]:
+            del _STAT_CACHE[path]
+        _STAT_CACHE.update(stats)
+    return [(folder_path, file_path) for _, folder_path, file_path in sorted(found)]
+
+def source_stat(file_path):
+    """Returns the stat result cached by the last discovery walk, or a fresh os.stat."""
+    with _STAT_CACHE_LOCK:
+        stat = _STAT_CACHE.get(file_path)
+    return stat if stat is not None else os.stat(file_path)
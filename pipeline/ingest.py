@@ -0,0 +1,264 @@
+import os
+import json
+import hashlib
+import time
+import pandas as pd
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+from .discovery import DEFAULT_LAYOUT, get_correct_parent_folder, path_fields, source_stat
+from .readers import SOURCE_READERS, column_mapping, normalize_dates
+from .aggregation import categorize_keys, combine_partials, partial_aggregate, summary_keys
+
+def read_source_file(folder_path, file_path, system_config):
+    """Reads one source file and applies the column mapping, date format and extra columns.
+
+    add_columns values are "folder_name" (the file's folder),
+    "parent_folder_before_last" (the folder above it) or a "{segment}" named
+    in the system's layout.
+    """
+    mapping = column_mapping(system_config)
+    extracted_folder = get_correct_parent_folder(folder_path)
+    fields = path_fields(file_path, system_config)
+
+    reader = SOURCE_READERS[os.path.splitext(file_path)[1].lower()]
+    df = reader(file_path, system_config)
+
+    available_columns = {col: new_col for col, new_col in mapping.items() if col in df.columns}
+    df = df[list(available_columns.keys())].rename(columns=available_columns)
+
+    # Date formatting
+    if "Date Post" in df.columns and "date_format" in system_config:
+        df["Date Post"] = normalize_dates(df["Date Post"], system_config)
+    elif "Month" in df.columns and "date_format" in system_config:
+        df["Month"] = normalize_dates(df["Month"], system_config, replace_underscores=True)
+    """added astype(str).str.replace("_","-") 
+    for date formatting of different formats in the form of strings and non string data type"""
+
+    # Add extra columns
+    for new_col, value in system_config.get("add_columns", {}).items():
+        if value == "folder_name":
+            df[new_col] = os.path.basename(folder_path)
+        elif value == "parent_folder_before_last":
+            df[new_col] = extracted_folder
+        elif value.startswith("{") and value.endswith("}"):
+            if value[1:-1] not in fields:
+                raise ValueError(f"add_columns {new_col}: layout {system_config.get('layout', DEFAULT_LAYOUT)} has no {value} segment")
+            df[new_col] = fields[value[1:-1]]
+
+    if system_config.get("compact_dtypes", False):
+        df = categorize_keys(df, system_config)  # Keys stay categorical through concat and groupby
+    return df
+
+def file_lineage(df, system_config, file_path):
+    """Returns one lineage row per summary key in a standardized file.
+
+    Each row holds the key, the source file, its row count and the file's
+    sum of every numeric column for that key. Files without the key
+    columns give an empty frame.
+    """
+    keys = summary_keys(system_config)
+    if not set(keys) <= set(df.columns):
+        return pd.DataFrame(columns=keys + ["Source File", "Rows"])
+    metrics = [col for col in df.columns if col not in keys and pd.api.types.is_numeric_dtype(df[col])]
+    lineage = df.groupby(keys, as_index=False, observed=True).agg(Rows=(keys[0], "size"), **{col: (col, "sum") for col in metrics})
+    lineage.insert(len(keys), "Source File", file_path)
+    return lineage
+
+def _read_source_file_task(task):
+    """Process pool entry point: returns (df, None, stats) on success or (None, error message, stats).
+
+    stats records the file's parse time, bytes on disk and rows read. With
+    streaming_aggregation the file is reduced to partial aggregates in the
+    worker, so only per-key rows travel back to the parent process. When
+    lineage is requested, stats["lineage"] holds the file's file_lineage
+    rows, computed before any aggregation.
+    """
+    folder_path, file_path, system_config, lineage = task
+    stats = {"path": file_path, "bytes": os.path.getsize(file_path), "rows": 0}
+    start = time.perf_counter()
+    try:
+        df = read_source_file(folder_path, file_path, system_config)
+        stats["rows"] = len(df)
+        if lineage:
+            stats["lineage"] = file_lineage(df, system_config, file_path)
+        if system_config.get("streaming_aggregation", False):
+            df = partial_aggregate(df, system_config)
+        return df, None, stats
+    except Exception as e:
+        return None, str(e), stats
+    finally:
+        stats["seconds"] = round(time.perf_counter() - start, 6)
+
+# Process pool shared by every system's reads while shared_reader_pool is active
+_SHARED_POOL = None
+
+@contextmanager
+def shared_reader_pool(max_workers):
+    """Sends every parallel read in the block to one process pool of max_workers.
+
+    Systems running concurrently then share a single worker budget instead
+    of each opening a max_workers pool of its own.
+    """
+    global _SHARED_POOL
+    if not max_workers or max_workers <= 1:
+        yield
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        _SHARED_POOL = executor
+        try:
+            yield
+        finally:
+            _SHARED_POOL = None
+
+def iter_source_results(source_files, system_config, max_workers=1, lineage=False):
+    """Yields one (df, error, stats) triple per source file, in the order given.
+
+    Parallel reads use the shared_reader_pool when one is active.
+    """
+    tasks = [(folder_path, file_path, system_config, lineage) for folder_path, file_path in source_files]
+    if max_workers and max_workers > 1 and len(tasks) > 1:
+        if _SHARED_POOL is not None:
+            yield from _SHARED_POOL.map(_read_source_file_task, tasks)
+            return
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            yield from executor.map(_read_source_file_task, tasks)
+    else:
+        for task in tasks:
+            yield _read_source_file_task(task)
+
+def read_source_files(source_files, system_config, max_workers=1, file_stats=None, lineage=None):
+    """Reads every source file, fanning out to a process pool when max_workers > 1.
+
+    Returns (frames, errors) with frames in the same order as source_files and
+    errors as a list of (file_path, message) tuples. With streaming_aggregation
+    each file's partial is folded into a single running partial as it
+    arrives, so frames holds at most one frame sized by the number of keys.
+    Per-file parse stats are appended to file_stats and per-file lineage
+    frames to lineage, when they are given.
+    """
+    streaming = system_config.get("streaming_aggregation", False)
+    results = iter_source_results(source_files, system_config, max_workers, lineage is not None)
+
+    frames = []
+    errors = []
+    for (folder_path, file_path), (df, error, stats) in zip(source_files, results):
+        file_lineage_df = stats.pop("lineage", None)
+        if lineage is not None and file_lineage_df is not None:
+            lineage.append(file_lineage_df)
+        if file_stats is not None:
+            file_stats.append(stats)
+        if error is not None:
+            errors.append((file_path, error))
+        elif streaming:
+            frames = [combine_partials(frames + [df], system_config)]
+        else:
+            frames.append(df)
+    return frames, errors
+
+def system_config_hash(system_config):
+    """Hashes the parts of a system config that change how a file is standardized."""
+    relevant = {key: system_config.get(key) for key in ("columns", "date_format", "input_date_formats", "add_columns", "layout", "projected_reader", "compact_dtypes", "streaming_aggregation", "aggregate_functions", "filter_conditions")}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()
+
+def file_content_hash(file_path, chunk_size=1024 * 1024):
+    """Returns the sha256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(cache_folder):
+    """Loads the incremental manifest, or an empty one if none exists yet."""
+    manifest_path = os.path.join(cache_folder, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r") as file:
+        return json.load(file)
+
+def save_manifest(cache_folder, manifest):
+    """Writes the incremental manifest atomically."""
+    manifest_path = os.path.join(cache_folder, "manifest.json")
+    with open(manifest_path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=4)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+def _cache_file_for(cache_folder, file_path):
+    """Returns the cached standardized frame path for a source file."""
+    return os.path.join(cache_folder, hashlib.sha1(file_path.encode("utf-8")).hexdigest() + ".pkl")
+
+def read_source_files_incremental(source_files, system_config, cache_folder, max_workers=1, file_stats=None, lineage=None):
+    """Like read_source_files, but only re-reads files that are new or changed.
+
+    The manifest records size, mtime, content hash and config hash per file.
+    A file is reused from its cached standardized frame when the config hash
+    matches and either size/mtime are unchanged or the content hash still
+    matches. Lineage rows are cached next to the frame. Cache entries for
+    files that disappeared are removed.
+    """
+    os.makedirs(cache_folder, exist_ok=True)
+    manifest = load_manifest(cache_folder)
+    config_hash = system_config_hash(system_config)
+
+    new_manifest = {}
+    frames_by_path = {}
+    lineage_by_path = {}
+    to_read = []
+    for folder_path, file_path in source_files:
+        stat = source_stat(file_path)
+        entry = manifest.get(file_path)
+        cache_file = _cache_file_for(cache_folder, file_path)
+        lineage_file = cache_file[:-len(".pkl")] + ".lineage.pkl"
+        if entry and entry["config_hash"] == config_hash and os.path.exists(cache_file) and (lineage is None or os.path.exists(lineage_file)):
+            if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                content_hash = entry["content_hash"]
+            else:
+                content_hash = file_content_hash(file_path)
+            if content_hash == entry["content_hash"]:
+                frames_by_path[file_path] = pd.read_pickle(cache_file)
+                if lineage is not None:
+                    lineage_by_path[file_path] = pd.read_pickle(lineage_file)
+                new_manifest[file_path] = dict(entry, size=stat.st_size, mtime=stat.st_mtime)
+                if file_stats is not None:
+                    file_stats.append({"path": file_path, "bytes": 0, "rows": 0, "seconds": 0.0, "cached": True})
+                continue
+        to_read.append((folder_path, file_path))
+
+    errors = []
+    results = iter_source_results(to_read, system_config, max_workers, lineage is not None)
+    for (folder_path, file_path), (df, error, stats) in zip(to_read, results):
+        file_lineage_df = stats.pop("lineage", None)
+        if file_stats is not None:
+            file_stats.append(stats)
+        if error is not None:
+            errors.append((file_path, error))
+            continue
+        stat = os.stat(file_path)
+        cache_file = _cache_file_for(cache_folder, file_path)
+        df.to_pickle(cache_file)
+        if file_lineage_df is not None:
+            file_lineage_df.to_pickle(cache_file[:-len(".pkl")] + ".lineage.pkl")
+            lineage_by_path[file_path] = file_lineage_df
+        new_manifest[file_path] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "content_hash": file_content_hash(file_path),
+            "config_hash": config_hash,
+        }
+        frames_by_path[file_path] = df
+
+    # Drop cached frames for files that were removed or now fail to load
+    for file_path in manifest:
+        cache_file = _cache_file_for(cache_folder, file_path)
+        if file_path not in new_manifest:
+            for stale_file in (cache_file, cache_file[:-len(".pkl")] + ".lineage.pkl"):
+                if os.path.exists(stale_file):
+                    os.remove(stale_file)
+    save_manifest(cache_folder, new_manifest)
+
+    print(f"Incremental: {len(to_read)} file(s) read, {len(source_files) - len(to_read)} reused from cache")
+    frames = [frames_by_path[file_path] for folder_path, file_path in source_files if file_path in frames_by_path]
+    if lineage is not None:
+        lineage.extend(lineage_by_path[file_path] for folder_path, file_path in source_files if file_path in lineage_by_path)
+    return frames, errors
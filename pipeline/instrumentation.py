@@ -0,0 +1,60 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:  # Optional: /proc/self/statm is used on Linux without it
+    psutil = None
+
+def current_rss():
+    """Returns the resident set size of this process in bytes, or None if unknown."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+@contextmanager
+def track_peak_rss(interval=0.01):
+    """Samples this process's RSS while the block runs; yields a dict holding "peak_rss_bytes".
+
+    RSS is process-wide, so blocks running concurrently on other threads are
+    included, and reader pool workers are not.
+    """
+    result = {"peak_rss_bytes": current_rss()}
+    done = threading.Event()
+
+    def sample():
+        while True:
+            rss = current_rss()
+            if rss is not None and (result["peak_rss_bytes"] is None or rss > result["peak_rss_bytes"]):
+                result["peak_rss_bytes"] = rss
+            if done.wait(interval):
+                break
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield result
+    finally:
+        done.set()
+        sampler.join()
+
+@contextmanager
+def timed_stage(report, stage):
+    """Records a stage's wall time in report["stages"][stage]; a no-op when report is None.
+
+    Yields a dict the caller can add counts to (rows, files, ...).
+    """
+    stats = {}
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        if report is not None:
+            stats["seconds"] = round(time.perf_counter() - start, 6)
+            report.setdefault("stages", {})[stage] = stats
@@ -0,0 +1,133 @@
+import os
+import numpy as np
+import openpyxl
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+EXCEL_MAX_ROWS = 1048576  # Rows per worksheet, header included
+EXCEL_WRITE_CHUNK = 50000  # Rows converted to Python values at a time
+
+def _sheet_title(name, part):
+    """Returns an Excel-safe sheet title for the given part of a sheet."""
+    title = "".join("_" if char in '[]:*?/\\' else char for char in str(name))
+    suffix = f"_{part}" if part > 1 else ""
+    return title[:31 - len(suffix)] + suffix
+
+def _numbered_path(output_path, number):
+    """Returns output_path for the first file and base_<number>.ext for overflow files."""
+    if number == 1:
+        return output_path
+    base, extension = os.path.splitext(output_path)
+    return f"{base}_{number}{extension}"
+
+def write_excel_output(sheets, output_path, max_rows=EXCEL_MAX_ROWS, max_sheets_per_file=None):
+    """Writes {sheet name: frame} to xlsx with openpyxl's write-only (constant memory) mode.
+
+    A frame longer than a sheet allows continues on name_2, name_3, ...;
+    when max_sheets_per_file is set, further sheets go to output_2.xlsx,
+    output_3.xlsx, ... Returns the list of files written.
+    """
+    rows_per_sheet = max_rows - 1  # Leave room for the header row
+    pieces = []
+    for name, df in sheets.items():
+        part_count = max(1, -(-len(df) // rows_per_sheet))
+        for part in range(part_count):
+            pieces.append((_sheet_title(name, part + 1), df, part * rows_per_sheet))
+
+    paths = []
+    workbook = None
+    for index, (title, df, start) in enumerate(pieces):
+        if workbook is None or (max_sheets_per_file and index % max_sheets_per_file == 0):
+            if workbook is not None:
+                workbook.save(paths[-1])
+            workbook = openpyxl.Workbook(write_only=True)
+            paths.append(_numbered_path(output_path, len(paths) + 1))
+
+        sheet = workbook.create_sheet(title)
+        sheet.append([str(col) for col in df.columns])
+        stop = min(start + rows_per_sheet, len(df))
+        for chunk_start in range(start, stop, EXCEL_WRITE_CHUNK):
+            chunk = df.iloc[chunk_start:min(chunk_start + EXCEL_WRITE_CHUNK, stop)].astype(object)
+            chunk = chunk.where(chunk.notna(), None).replace({np.inf: "inf", -np.inf: "-inf"})  # Same cells as DataFrame.to_excel
+            for row in chunk.itertuples(index=False, name=None):
+                sheet.append(row)
+    workbook.save(paths[-1])
+    return paths
+
+def write_columnar_output(df, output_path, export_format):
+    """Writes a parquet or csv copy of df next to output_path and returns its path."""
+    base = os.path.splitext(output_path)[0]
+    if export_format == "parquet":
+        path = base + ".parquet"
+        df.to_parquet(path, index=False)
+    elif export_format == "csv":
+        path = base + ".csv"
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f"Unknown export format '{export_format}', expected 'parquet' or 'csv'")
+    return path
+
+def write_combined_output(combined_df, frames_by_system, output_path, output_config):
+    """Writes a combined output as xlsx plus any configured columnar exports, in parallel.
+
+    output_config keys: sheet_per_system (one sheet per source system
+    instead of one combined sheet), max_rows_per_sheet, max_sheets_per_file
+    and export_formats (e.g. ["parquet", "csv"]). Returns the files written.
+    """
+    if output_config.get("sheet_per_system", False):
+        sheets = frames_by_system
+    else:
+        sheets = {"Sheet1": combined_df}
+    export_formats = output_config.get("export_formats", [])
+
+    with ThreadPoolExecutor(max_workers=1 + len(export_formats)) as executor:
+        excel_future = executor.submit(
+            write_excel_output,
+            sheets,
+            output_path,
+            output_config.get("max_rows_per_sheet", EXCEL_MAX_ROWS),
+            output_config.get("max_sheets_per_file"),
+        )
+        export_futures = [executor.submit(write_columnar_output, combined_df, output_path, export_format) for export_format in export_formats]
+        return excel_future.result() + [future.result() for future in export_futures]
+
+REFERENCE_FILE = "c2.xlsx"
+STANDARDIZED_OUTPUT_PATH = "final_standardized_summary.xlsx"
+RECONCILED_OUTPUT_PATH = "final_combined_reconciliation2.xlsx"
+
+def _suffixed_path(path, suffix):
+    """Inserts suffix before the extension of path."""
+    base, extension = os.path.splitext(path)
+    return base + suffix + extension
+
+def write_outputs(standardized_by_system, reconciled_by_reference, output_config, stats=None, suffix=""):
+    """Writes the combined standardized output and one combined reconciled output per reference.
+
+    reconciled_by_reference maps a reference label to {system: reconciled
+    frame}. With more than one reference, each reconciled output name gets
+    "_<label>". suffix is added to every output name (e.g. "_2025-01" for a
+    single period). Paths come from output_config standardized_path and
+    reconciled_path. Row counts are added to stats when it is given.
+    """
+    stats = {} if stats is None else stats
+    if standardized_by_system:
+        combined_standardized_df = pd.concat(standardized_by_system.values(), ignore_index=True)
+        output_path = _suffixed_path(output_config.get("standardized_path", STANDARDIZED_OUTPUT_PATH), suffix)
+        written = write_combined_output(combined_standardized_df, standardized_by_system, output_path, output_config)
+        stats["standardized_rows"] = len(combined_standardized_df)
+        print(f"All standardized summaries saved in: {', '.join(written)}")
+
+    for label, reconciled_by_system in reconciled_by_reference.items():
+        if not reconciled_by_system:
+            continue
+        final_combined_df = pd.concat(reconciled_by_system.values(), ignore_index=True)
+        reference_suffix = f"_{label}" if len(reconciled_by_reference) > 1 else ""
+        output_path = _suffixed_path(output_config.get("reconciled_path", RECONCILED_OUTPUT_PATH), reference_suffix + suffix)
+        written = write_combined_output(final_combined_df, reconciled_by_system, output_path, output_config)
+        stats["reconciled_rows"] = stats.get("reconciled_rows", 0) + len(final_combined_df)
+        print(f"All reconciled outputs{f' for {label}' if reference_suffix else ''} saved in: {', '.join(written)}")
+    return stats
+
+def reference_label(reference_file):
+    """Returns the label a reference file's outputs are named by (its file name without extension)."""
+    return os.path.splitext(os.path.basename(reference_file))[0]
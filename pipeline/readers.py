@@ -0,0 +1,309 @@
+import json
+import datetime
+import importlib.util
+import numpy as np
+import openpyxl
+import pandas as pd
+
+def _filter_not_empty(series, argument):
+    """Rows whose value is present and not blank."""
+    mask = series.notna()
+    if not pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_datetime64_any_dtype(series):
+        mask &= series.astype(str).str.strip().ne("")
+    return mask
+
+def _filter_equals(series, argument):
+    """Rows equal to the given value."""
+    return series.eq(argument)
+
+def _filter_in(series, argument):
+    """Rows whose value is one of the given values."""
+    return series.isin(argument)
+
+def _filter_range(series, argument):
+    """Rows whose numeric value is within [low, high]; either bound may be null."""
+    low, high = argument
+    values = pd.to_numeric(series, errors='coerce')
+    mask = values.notna()
+    if low is not None:
+        mask &= values >= low
+    if high is not None:
+        mask &= values <= high
+    return mask
+
+def _filter_date_between(series, argument):
+    """Rows whose date is within [start, end]; either bound may be null."""
+    start, end = argument
+    codes, uniques = pd.factorize(series)  # Parse each distinct value once
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors='coerce')
+    mask = parsed.notna()
+    if start is not None:
+        mask &= parsed >= pd.Timestamp(start)
+    if end is not None:
+        mask &= parsed <= pd.Timestamp(end)
+    keep = np.append(mask.to_numpy(), False)  # codes of -1 (missing values) are dropped
+    return pd.Series(keep[codes], index=series.index)
+
+# filter_conditions operators. A condition is either an operator name
+# ("not_empty") or a dict of operator -> argument, all of which must hold.
+FILTER_OPERATORS = {
+    "not_empty": _filter_not_empty,
+    "equals": _filter_equals,
+    "in": _filter_in,
+    "range": _filter_range,
+    "date_between": _filter_date_between,
+}
+
+_FILTER_CACHE = {}  # Compiled filters per filter_conditions, reused across files in a process
+
+def normalize_header(name):
+    """Normalizes a source header (or a config key naming one) the way the readers do: stripped, title case."""
+    return str(name).strip().title()
+
+def column_mapping(system_config):
+    """Returns the system's columns mapping keyed by normalized source header.
+
+    Readers title-case file headers, so a mapping key such as "Ledger Date
+    by Month" has to be normalized the same way to find its column. The
+    first key wins when two normalize alike.
+    """
+    mapping = {}
+    for source_col, new_col in system_config["columns"].items():
+        mapping.setdefault(normalize_header(source_col), new_col)
+    return mapping
+
+def _filter_sources(col, mapping):
+    """Returns the normalized source header(s) a filter on col reads.
+
+    A condition may name a source header or a mapped column; mapped names
+    are translated back to the source header(s) that feed them.
+    """
+    sources = [source_col for source_col, new_col in mapping.items() if new_col == col and source_col != col]
+    return sources or [normalize_header(col)]
+
+def filter_columns(system_config):
+    """Returns the normalized source columns the filter_conditions read."""
+    columns = []
+    mapping = column_mapping(system_config)
+    for col in system_config.get("filter_conditions", {}):
+        for source_col in _filter_sources(col, mapping):
+            if source_col not in columns:
+                columns.append(source_col)
+    return columns
+
+def compile_filters(system_config):
+    """Compiles filter_conditions into one function that drops non-matching rows.
+
+    The function takes a frame with normalized source headers and returns
+    the rows that satisfy every condition. Returns None when the system has
+    no filters. Unknown operators raise ValueError when compiling; a file
+    missing a filtered column raises ValueError when filtered.
+    """
+    conditions = system_config.get("filter_conditions")
+    if not conditions:
+        return None
+    cache_key = json.dumps([conditions, system_config["columns"]], sort_keys=True, default=str)
+    if cache_key in _FILTER_CACHE:
+        return _FILTER_CACHE[cache_key]
+
+    mapping = column_mapping(system_config)
+    predicates = []
+    for col, condition in conditions.items():
+        sources = _filter_sources(col, mapping)
+        operations = {condition: None} if isinstance(condition, str) else condition
+        for operator, argument in operations.items():
+            if operator not in FILTER_OPERATORS:
+                raise ValueError(f"Unknown filter operator '{operator}' for {col}, expected one of {list(FILTER_OPERATORS)}")
+            for source_col in sources:
+                predicates.append((source_col, FILTER_OPERATORS[operator], argument))
+
+    def row_filter(df):
+        mask = pd.Series(True, index=df.index)
+        for source_col, predicate, argument in predicates:
+            if source_col not in df.columns:
+                raise ValueError(f"Filter column '{source_col}' not found")
+            mask &= predicate(df[source_col], argument)
+        return df[mask] if not mask.all() else df
+
+    _FILTER_CACHE[cache_key] = row_filter
+    return row_filter
+
+def apply_filters(df, system_config):
+    """Applies the system's compiled filter_conditions to a frame with normalized headers."""
+    row_filter = compile_filters(system_config)
+    return row_filter(df).reset_index(drop=True) if row_filter is not None else df
+
+def source_columns(system_config):
+    """Returns the normalized source headers a reader has to load: mapped plus filtered columns."""
+    columns = list(column_mapping(system_config))
+    return columns + [col for col in filter_columns(system_config) if col not in columns]
+
+def read_projected_xlsx(file_path, column_mapping, row_filter=None, chunk_rows=50000):
+    """Streams only the mapped columns from the first sheet of an xlsx workbook.
+
+    Only the header row is inspected up front; it is normalized with the same
+    strip + title case as the full-sheet path, and then just the resolved
+    columns are pulled row by row from a read-only workbook. column_mapping
+    may be any iterable of normalized header names. When row_filter is given
+    it is applied to every chunk_rows block as it is read, so filtered-out
+    rows never accumulate.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        header = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        normalized = {}
+        for index, name in enumerate(header):
+            if name is not None:
+                normalized.setdefault(str(name).strip().title(), index)
+        positions = {col: normalized[col] for col in column_mapping if col in normalized}
+
+        chunks = []
+        values = {col: [] for col in positions}
+        if positions:
+            max_col = max(positions.values()) + 1
+            buffered = 0
+            for row in sheet.iter_rows(min_row=2, max_col=max_col, values_only=True):
+                picked = [row[index] if index < len(row) else None for index in positions.values()]
+                if all(value is None for value in picked):  # Skip rows empty in every mapped column
+                    continue
+                for col, value in zip(values, picked):
+                    values[col].append(value)
+                buffered += 1
+                if row_filter is not None and buffered >= chunk_rows:
+                    chunks.append(row_filter(pd.DataFrame(values)))
+                    values = {col: [] for col in positions}
+                    buffered = 0
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame(values)
+    if row_filter is not None:
+        df = row_filter(df)
+    if chunks:
+        df = pd.concat(chunks + [df], ignore_index=True)
+    return df.reset_index(drop=True)
+
+def csv_dtype_hints(system_config):
+    """Derives read dtypes for mapped source columns from the system config.
+
+    Columns that are aggregated are read as float64 and date columns as
+    strings (the date stage parses them); everything else is inferred.
+    """
+    aggregated = set(system_config.get("aggregate_functions", {}))
+    hints = {}
+    for col, new_col in column_mapping(system_config).items():
+        if new_col in ("Date Post", "Month"):
+            hints[col] = str
+        elif new_col in aggregated:
+            hints[col] = "float64"
+    return hints
+
+def read_delimited_source(file_path, system_config, sep=","):
+    """Reads the mapped and filtered columns of a CSV/TSV export.
+
+    Uses the multithreaded pyarrow engine when pyarrow is installed and the
+    pandas C engine otherwise. Falls back to inferred dtypes if the hinted
+    ones do not fit the data.
+    """
+    engine = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+    header = pd.read_csv(file_path, sep=sep, nrows=0).columns
+    raw_names = {}
+    for name in header:
+        raw_names.setdefault(str(name).strip().title(), name)
+    usecols = [raw_names[col] for col in source_columns(system_config) if col in raw_names]
+    hints = csv_dtype_hints(system_config)
+    dtype = {raw_names[col]: hints[col] for col in hints if col in raw_names}
+
+    try:
+        df = pd.read_csv(file_path, sep=sep, usecols=usecols, dtype=dtype, engine=engine)
+    except ValueError:
+        df = pd.read_csv(file_path, sep=sep, usecols=usecols, engine=engine)
+    df.columns = df.columns.str.strip().str.title()
+    return apply_filters(df, system_config)
+
+def read_csv_source(file_path, system_config):
+    """Reader for .csv exports."""
+    return read_delimited_source(file_path, system_config, sep=",")
+
+def read_tsv_source(file_path, system_config):
+    """Reader for .tsv exports."""
+    return read_delimited_source(file_path, system_config, sep="\t")
+
+def read_xlsx_source(file_path, system_config):
+    """Reader for .xlsx workbooks (column-projected unless projected_reader is false)."""
+    if system_config.get("projected_reader", True):
+        # Header-normalized, mapped and filtered columns only, filtered per chunk while streaming
+        return read_projected_xlsx(file_path, source_columns(system_config), compile_filters(system_config))
+    df = pd.read_excel(file_path, engine='openpyxl')
+    df.columns = df.columns.str.strip().str.title()
+    return apply_filters(df, system_config)
+
+def read_xls_source(file_path, system_config):
+    """Reader for legacy .xls workbooks (needs xlrd)."""
+    df = pd.read_excel(file_path, engine='xlrd')
+    df.columns = df.columns.str.strip().str.title()
+    return apply_filters(df, system_config)
+
+# Source readers keyed by lower-case file extension. Each returns a frame whose
+# headers are already stripped and title-cased, with filter_conditions applied.
+SOURCE_READERS = {
+    ".xlsx": read_xlsx_source,
+    ".xls": read_xls_source,
+    ".csv": read_csv_source,
+    ".tsv": read_tsv_source,
+}
+
+# Formatted dates per (input formats, output format, underscore handling),
+# shared by every file a process reads during the run. Only used when
+# input_date_formats is declared.
+_DATE_CACHE = {}
+_FORMATTED_DATE_DTYPE = pd.Series(pd.NaT, dtype="datetime64[ns]").dt.strftime("%Y").dtype  # What .dt.strftime returns
+
+def _parse_dates(raw, input_formats):
+    """Parses raw date values, trying each declared input format in order."""
+    if not input_formats:
+        return pd.to_datetime(raw, errors='coerce')
+    parsed = pd.Series(pd.NaT, index=raw.index, dtype="datetime64[ns]")
+    for input_format in input_formats:
+        remaining = parsed.isna()
+        if not remaining.any():
+            break
+        parsed[remaining] = pd.to_datetime(raw[remaining], format=input_format, errors='coerce')
+    return parsed
+
+def _format_dates(raw_values, input_formats, output_format, replace_underscores):
+    """Parses raw date values as one batch and returns them formatted with output_format."""
+    raw = pd.Series(raw_values, dtype=object)
+    if replace_underscores:
+        # Datetime cells parse as they are; stringifying them would break a declared input format
+        raw = raw.map(lambda value: value if isinstance(value, (datetime.date, np.datetime64)) else str(value).replace("_", "-"))
+    return _parse_dates(raw, input_formats).dt.strftime(output_format).tolist()
+
+def normalize_dates(values, system_config, replace_underscores=False):
+    """Formats a date column with date_format, parsing each distinct value only once.
+
+    input_date_formats (a format or list of formats) in the system config
+    pins the parse instead of letting pandas infer it; only then are parsed
+    values cached for the rest of the run, since an inferred format depends
+    on the batch it was inferred from. Values are mapped back to rows by
+    position.
+    """
+    output_format = system_config["date_format"]
+    input_formats = system_config.get("input_date_formats") or []
+    if isinstance(input_formats, str):
+        input_formats = [input_formats]
+
+    codes, uniques = pd.factorize(values)
+    if input_formats:
+        cache = _DATE_CACHE.setdefault((tuple(input_formats), output_format, replace_underscores), {})
+        missing = [value for value in uniques if value not in cache]
+        if missing:
+            cache.update(zip(missing, _format_dates(missing, input_formats, output_format, replace_underscores)))
+        formatted = [cache[value] for value in uniques]
+    else:
+        formatted = _format_dates(list(uniques), input_formats, output_format, replace_underscores)  # The file's own values, inferred together
+
+    lookup = np.array(formatted + [np.nan], dtype=object)  # codes of -1 (missing values) hit the trailing NaN
+    return pd.Series(lookup[codes], index=values.index, dtype=_FORMATTED_DATE_DTYPE)
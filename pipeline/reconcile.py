@@ -0,0 +1,389 @@
+import os
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+
+from .instrumentation import timed_stage
+from .aggregation import summary_keys
+from .ingest import file_content_hash
+from .staging import load_partitions, read_lineage_index, read_staging_file
+
+# (source column, reference column, diff column) for each reconciled metric.
+# The bit for a metric in Mismatch_Mask is 1 << its position in this list.
+RECONCILE_METRICS = [
+    ("MTDcharges", "Engage_Charges", "EngageDiffCharges"),
+    ("MTDpayments", "Engage_Payments", "EngageDiffPayments"),
+    ("EngageAdjustments", "Engage_Adjustments", "EngageDiffAdjustments"),
+]
+
+def metric_tolerances(config):
+    """Returns (absolute, percentage) tolerance arrays aligned with RECONCILE_METRICS.
+
+    Per-metric values come from config["tolerances"][<source column>]; the
+    percentage falls back to percentage_threshold and the absolute tolerance
+    is disabled (NaN) unless set.
+    """
+    default_percentage = config.get("percentage_threshold")
+    tolerances = config.get("tolerances", {})
+    absolute = []
+    percentage = []
+    for source_col, _, _ in RECONCILE_METRICS:
+        metric_tolerance = tolerances.get(source_col, {})
+        absolute.append(metric_tolerance.get("absolute", np.nan))
+        percentage.append(metric_tolerance.get("percentage", default_percentage if default_percentage is not None else 0))
+    return np.array(absolute, dtype=float), np.array(percentage, dtype=float)
+
+def compare_metrics(merged_df, config):
+    """Adds diff, percentage, Match_Status and Mismatch_Mask columns in one vectorized pass.
+
+    A metric is within tolerance when its percentage difference is at most
+    its percentage tolerance or its absolute difference is at most its
+    absolute tolerance; a metric missing a value on either side (e.g. a
+    row with no reference row) is outside it. Mismatch_Mask has one bit
+    set per metric outside tolerance and Match_Status is Match when the
+    mask is 0. With exact_match set in the config, a metric only matches
+    when its difference is exactly 0 and the tolerances are ignored.
+    """
+    source = merged_df[[source_col for source_col, _, _ in RECONCILE_METRICS]].to_numpy(dtype=float)
+    reference = merged_df[[reference_col for _, reference_col, _ in RECONCILE_METRICS]].to_numpy(dtype=float)
+
+    diff = (source - reference).round(10)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        perc = np.abs(diff) / source
+    perc = (np.where(np.isnan(perc), 0, perc) * 100).round(10)
+
+    if config.get("exact_match", False):
+        within = diff == 0
+    else:
+        absolute_tolerance, percentage_tolerance = metric_tolerances(config)
+        within = (perc <= percentage_tolerance) | (np.abs(diff) <= absolute_tolerance)
+    within &= ~np.isnan(diff)  # No reference (or source) value to compare against
+    bits = 1 << np.arange(len(RECONCILE_METRICS))
+    mask = ((~within) * bits).sum(axis=1)
+
+    diff_cols = [diff_col for _, _, diff_col in RECONCILE_METRICS]
+    merged_df[diff_cols] = diff
+    merged_df[[diff_col + '_Perc' for diff_col in diff_cols]] = perc
+    merged_df['Match_Status'] = np.where(mask == 0, 'Match', 'Mismatch')
+    merged_df['Mismatch_Mask'] = mask
+    return merged_df
+
+def load_reference(file_c, cache_folder=None):
+    """Loads the reference workbook and indexes it on Matchkey.
+
+    The parsed frame is cached on disk under cache_folder (default
+    .reference_cache next to the workbook), keyed by the workbook's content
+    hash, so later runs against the same file skip parsing it. The frame is
+    indexed on Matchkey for key lookups such as explain_key.
+    """
+    if cache_folder is None:
+        cache_folder = os.path.join(os.path.dirname(file_c), ".reference_cache")
+    os.makedirs(cache_folder, exist_ok=True)
+
+    base_name = os.path.basename(file_c)
+    cache_file = os.path.join(cache_folder, f"{base_name}.{file_content_hash(file_c)}.pkl")
+    if os.path.exists(cache_file):
+        df_c = pd.read_pickle(cache_file)
+    else:
+        df_c = pd.read_excel(file_c)
+        for stale_file in os.listdir(cache_folder):  # Drop caches of older versions of this file
+            if stale_file.startswith(base_name + ".") and stale_file.endswith(".pkl"):
+                os.remove(os.path.join(cache_folder, stale_file))
+        df_c.to_pickle(cache_file)
+
+    reference_df = df_c.set_index('Matchkey', drop=False)
+    reference_df.index.name = None
+    return reference_df
+
+def encode_match_keys(practitioners, periods, matchkeys):
+    """Dictionary-encodes the reconciliation join key as integers.
+
+    Summary practitioner names and period labels are factorized, so each
+    Concat_Key string is built once per distinct pair. Each distinct
+    Concat_Key gets an integer id, and reference Matchkeys are looked up in
+    the same dictionary, so rows join exactly when their strings are equal
+    (names and periods may contain "_"). Returns (summary_ids,
+    reference_ids, concat_keys); reference keys that cannot match get -1.
+    """
+    practitioner_ids, practitioner_names = pd.factorize(practitioners.astype(str))
+    period_ids, period_labels = pd.factorize(periods.astype(str))
+    period_count = max(len(period_labels), 1)
+    pair_ids = practitioner_ids.astype(np.int64) * period_count + period_ids
+
+    pair_codes, pairs = pd.factorize(pair_ids)
+    pair_keys = pd.Series(practitioner_names.take(pairs // period_count)).str.cat(pd.Series(period_labels.take(pairs % period_count)), sep="_")
+    key_codes, key_labels = pd.factorize(pair_keys.to_numpy(dtype=object))  # Different pairs can spell the same key
+    summary_ids = key_codes[pair_codes].astype(np.int64)
+    concat_keys = np.asarray(key_labels, dtype=object)[summary_ids]
+    reference_ids = pd.Index(key_labels).get_indexer(matchkeys.astype(str).to_numpy(dtype=object)).astype(np.int64)
+    return summary_ids, reference_ids, concat_keys
+
+# Words dropped from practitioner names before fuzzy matching
+NAME_IGNORE_TOKENS = ("dr", "md", "do", "phd", "np", "pa", "dds", "dmd")
+
+def normalize_name(name, ignore_tokens=NAME_IGNORE_TOKENS):
+    """Lower-cases a practitioner name and drops accents, punctuation and titles; words are sorted."""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(sorted(token for token in re.split(r"[^a-z0-9]+", text) if token and token not in ignore_tokens))
+
+def name_ngrams(name, size=3):
+    """Returns the character n-grams of a space-padded name."""
+    padded = f" {name} "
+    return {padded[start:start + size] for start in range(max(1, len(padded) - size + 1))}
+
+def fuzzy_match_keys(queries, candidates, threshold=0.85, ngram_size=3, max_candidates=10, max_block_size=200, ignore_tokens=NAME_IGNORE_TOKENS):
+    """Matches (period, name) queries to (period, name) candidates, one to one.
+
+    Names are compared after normalize_name. Candidates are blocked by
+    period and name n-gram: a query looks only at its n-gram blocks of at
+    most max_block_size names (or its single smallest block when all are
+    larger), and is scored (difflib ratio, 0 to 1) against the
+    max_candidates names sharing the most of those n-grams. Pairs at or
+    above threshold are assigned best score first. Returns
+    {query position: (candidate position, score)}.
+    """
+    exact = {}
+    blocks = {}
+    normalized_candidates = []
+    for position, (period, name) in enumerate(candidates):
+        normalized = normalize_name(name, ignore_tokens)
+        normalized_candidates.append(normalized)
+        exact.setdefault((period, normalized), position)
+        for gram in name_ngrams(normalized, ngram_size):
+            blocks.setdefault((period, gram), []).append(position)
+
+    pairs = []
+    for query, (period, name) in enumerate(queries):
+        normalized = normalize_name(name, ignore_tokens)
+        if (period, normalized) in exact:
+            pairs.append((1.0, query, exact[(period, normalized)]))
+            continue
+        query_blocks = sorted((blocks[(period, gram)] for gram in name_ngrams(normalized, ngram_size) if (period, gram) in blocks), key=len)
+        shared = Counter()
+        for block in query_blocks:
+            if len(block) > max_block_size and shared:
+                break  # Common n-grams (" dr", "son") would make this all-pairs
+            shared.update(block)
+        for position, _ in shared.most_common(max_candidates):
+            score = SequenceMatcher(None, normalized, normalized_candidates[position]).ratio()
+            if score >= threshold:
+                pairs.append((score, query, position))
+
+    matches = {}
+    used = set()
+    for score, query, position in sorted(pairs, key=lambda pair: (-pair[0], pair[1], pair[2])):
+        if query not in matches and position not in used:
+            matches[query] = (position, round(score, 4))
+            used.add(position)
+    return matches
+
+def _merged_column(merged_df, column, suffix):
+    """Returns the name column has in merged_df; a column both frames had carries the join suffix."""
+    return column if column in merged_df.columns else column + suffix
+
+def fuzzy_match_unmatched(merged_df, reference_df, unmatched, claimed, date_column, fuzzy_config, suffixes=('_x', '_y')):
+    """Fills reference columns for summary rows the exact join missed, using fuzzy_match_keys.
+
+    unmatched flags the merged rows without a reference row; claimed flags
+    the reference rows some summary row already matched exactly, which are
+    not offered again. suffixes are the ones the join added to columns both
+    frames have. Adds Match_Type (exact, fuzzy or unmatched) and
+    Match_Score (1 for exact matches). Returns the number of rows matched.
+    """
+    merged_df['Match_Type'] = np.where(unmatched, 'unmatched', 'exact')
+    merged_df['Match_Score'] = np.where(unmatched, np.nan, 1.0)
+    if not unmatched.any() or claimed.all():
+        return 0
+
+    # One query per distinct practitioner/period left unmatched
+    query_columns = [_merged_column(merged_df, column, suffixes[0]) for column in (date_column, 'Practitioner Name')]
+    query_rows = merged_df.loc[unmatched, query_columns].astype(str)
+    query_codes, query_keys = pd.factorize(pd.MultiIndex.from_frame(query_rows))
+    queries = list(query_keys)
+
+    # Split each unclaimed Matchkey into (period, name), longest period label first
+    open_rows = np.flatnonzero(~claimed)
+    keys = pd.Series(reference_df['Matchkey'].astype(str).to_numpy(dtype=object)[open_rows])
+    assigned = np.zeros(len(keys), dtype=bool)
+    candidates = []
+    candidate_rows = []
+    for label in sorted({period for period, _ in queries}, key=len, reverse=True):
+        suffix = "_" + label
+        hits = np.flatnonzero(~assigned & keys.str.endswith(suffix).to_numpy())
+        assigned[hits] = True
+        candidates.extend((label, keys.iloc[hit][:-len(suffix)]) for hit in hits)
+        candidate_rows.extend(open_rows[hits])
+
+    matches = fuzzy_match_keys(
+        queries,
+        candidates,
+        fuzzy_config.get("threshold", 0.85),
+        fuzzy_config.get("ngram_size", 3),
+        fuzzy_config.get("max_candidates", 10),
+        fuzzy_config.get("max_block_size", 200),
+        tuple(fuzzy_config.get("ignore_tokens", NAME_IGNORE_TOKENS)),
+    )
+    if not matches:
+        return 0
+
+    reference_position = np.full(len(queries), -1, dtype=np.int64)
+    scores = np.full(len(queries), np.nan)
+    for query, (position, score) in matches.items():
+        reference_position[query] = candidate_rows[position]
+        scores[query] = score
+    row_positions = reference_position[query_codes]
+    matched = row_positions >= 0
+    rows = merged_df.index[unmatched][matched]
+    for col in reference_df.columns:
+        merged_df.loc[rows, _merged_column(merged_df, col, suffixes[1])] = reference_df[col].to_numpy()[row_positions[matched]]
+    merged_df.loc[rows, 'Match_Type'] = 'fuzzy'
+    merged_df.loc[rows, 'Match_Score'] = scores[query_codes][matched]
+    return int(matched.sum())
+
+def process_excel_files(summary_df, file_c,config, report=None, period_range=None):
+    """Performs reconciliation on the standardized data.
+
+    summary_df is the in-memory frame from process_system_data; a staging
+    file path is still accepted for reconciling a previous run, as is a
+    system's staging_store folder, of which only the partitions within
+    period_range are loaded. file_c is either the frame returned by
+    load_reference or a reference file path. With fuzzy_match enabled,
+    rows the exact join misses get a second, fuzzy pass on practitioner
+    name (see fuzzy_match_unmatched). reconcile_join "inner" keeps only
+    rows that found a reference row, and reconciled_columns selects and
+    orders the output columns. When a report dict is given, join,
+    fuzzy and compare timings go into it. Returns None, skipping the
+    system, when the summary or reference lacks a reconciled metric column.
+    """
+    if isinstance(summary_df, pd.DataFrame):
+        df_s = summary_df.copy()  # Keep Concat_Key out of the standardized output
+    elif os.path.isdir(summary_df):
+        df_s = load_partitions(summary_df, period_range)
+        if df_s is None:
+            print(f"No staged partitions in {summary_df} for the requested periods.")
+            return None
+    else:
+        df_s = read_staging_file(summary_df)
+    reference_df = file_c if isinstance(file_c, pd.DataFrame) else load_reference(file_c, config.get("reference_cache_folder"))
+    
+    if 'Date Post' in df_s.columns:
+        date_column = 'Date Post'
+    elif 'Month' in df_s.columns:
+        date_column = 'Month'
+    else:
+        print("Error: Neither 'Date Post' nor 'Month' found in the standardized file.")
+        print(f"Available columns: {df_s.columns.tolist()}")
+        return None
+
+    missing = [source_col for source_col, _, _ in RECONCILE_METRICS if source_col not in df_s.columns]
+    missing += [reference_col for _, reference_col, _ in RECONCILE_METRICS if reference_col not in reference_df.columns]
+    if missing:
+        print(f"Skipping reconciliation: the reconciled metric columns {missing} are missing.")
+        print(f"Available columns: {df_s.columns.tolist()}")
+        if report is not None:
+            report["reconciliation_skipped"] = f"missing columns {missing}"
+        return None
+    
+    with timed_stage(report, "reconciliation_join") as stats:
+        summary_ids, reference_ids, concat_keys = encode_match_keys(df_s['Practitioner Name'], df_s[date_column], reference_df['Matchkey'])
+        df_s['Concat_Key'] = concat_keys
+        df_s['_match_id'] = summary_ids
+        matchable = reference_ids >= 0
+        reference_by_id = reference_df[matchable].set_axis(pd.Index(reference_ids[matchable]), axis=0)
+        merged_df = df_s.join(reference_by_id, on='_match_id', how='left', lsuffix='_x', rsuffix='_y').drop(columns='_match_id').reset_index(drop=True)  # Integer-keyed left join, suffixes as DataFrame.merge
+        stats["rows"] = len(merged_df)
+
+    fuzzy_config = config.get("fuzzy_match", {})
+    if fuzzy_config.get("enabled", False):
+        with timed_stage(report, "reconciliation_fuzzy") as stats:
+            unmatched = merged_df[_merged_column(merged_df, 'Matchkey', '_y')].isna().to_numpy()  # Per merged row; duplicate Matchkeys fan rows out
+            claimed = np.isin(reference_ids, summary_ids)
+            stats["unmatched"] = int(unmatched.sum())
+            stats["matched"] = fuzzy_match_unmatched(merged_df, reference_df, unmatched, claimed, date_column, fuzzy_config)
+
+    if config.get("reconcile_join", "left") == "inner":
+        merged_df = merged_df[merged_df[_merged_column(merged_df, 'Matchkey', '_y')].notna()].reset_index(drop=True)  # Only rows with a reference row
+    
+    with timed_stage(report, "reconciliation_compare") as stats:
+        compare_metrics(merged_df, config)
+        stats["mismatched"] = int((merged_df['Match_Status'] == 'Mismatch').sum())
+
+    result_df = (merged_df)
+    result_df = result_df.copy()  # Avoid SettingWithCopyWarning
+    result_df["Comment"] = ""
+    reconciled_columns = config.get("reconciled_columns")
+    if reconciled_columns:
+        missing = [col for col in reconciled_columns if col not in result_df.columns]
+        if missing:
+            print(f"Warning: reconciled_columns {missing} are not in the reconciled output and are left out.")
+        result_df = result_df[[col for col in reconciled_columns if col in result_df.columns]]
+    return result_df
+
+def explain_key(config, concat_key, file_c):
+    """Explains a reconciliation key (Concat_Key) from the lineage index, without reading any source file.
+
+    Returns one dict per system whose lineage has the key, holding the
+    contributing files (path, rows and per-metric sums) and, per reconciled
+    metric, the source total, reference value, difference, percentage and
+    whether it is within tolerance. Source totals add up the file
+    contributions, so they equal the summary for sum aggregations.
+    """
+    reference_df = file_c if isinstance(file_c, pd.DataFrame) else load_reference(file_c, config.get("reference_cache_folder"))
+    reference_row = reference_df.loc[[concat_key]].iloc[0] if concat_key in reference_df.index else None
+    absolute_tolerance, percentage_tolerance = metric_tolerances(config)
+    exact_match = config.get("exact_match", False)
+
+    explanations = []
+    for system_name, system_config in config["systems"].items():
+        lineage_df = read_lineage_index(system_config)
+        keys = summary_keys(system_config)
+        if lineage_df is None or lineage_df.empty or not set(keys) <= set(lineage_df.columns):
+            continue
+        rows = lineage_df[lineage_df[keys[0]].astype(str).str.cat(lineage_df[keys[1]].astype(str), sep="_") == concat_key]
+        if rows.empty:
+            continue
+
+        metrics = []
+        for position, (source_col, reference_col, _) in enumerate(RECONCILE_METRICS):
+            if source_col not in rows.columns:
+                continue
+            source_total = float(rows[source_col].sum())
+            reference_value = float(reference_row[reference_col]) if reference_row is not None else np.nan
+            diff = round(source_total - reference_value, 10)
+            perc = round(abs(diff) / source_total * 100, 10) if source_total and not np.isnan(diff) else 0.0  # Same as compare_metrics
+            metrics.append({
+                "metric": source_col,
+                "source_total": source_total,
+                "reference": reference_value,
+                "diff": diff,
+                "perc": perc,
+                "within_tolerance": bool(diff == 0) if exact_match else bool(not np.isnan(diff) and (perc <= percentage_tolerance[position] or abs(diff) <= absolute_tolerance[position])),
+            })
+        explanations.append({
+            "system": system_name,
+            "key": concat_key,
+            "reference_found": reference_row is not None,
+            "files": rows.drop(columns=keys).sort_values("Source File").to_dict("records"),
+            "metrics": metrics,
+        })
+    return explanations
+
+def print_explanation(explanations, concat_key):
+    """Prints explain_key results, listing each file's contribution to the metrics."""
+    if not explanations:
+        print(f"No lineage found for {concat_key}; run with lineage enabled first.")
+        return
+    for explanation in explanations:
+        print(f"{explanation['system']}: {explanation['key']}")
+        if not explanation["reference_found"]:
+            print("  No reference row with this Matchkey")
+        for metric in explanation["metrics"]:
+            status = "within tolerance" if metric["within_tolerance"] else "MISMATCH"
+            print(f"  {metric['metric']}: source {metric['source_total']:.2f}, reference {metric['reference']:.2f}, diff {metric['diff']:.2f} ({metric['perc']:.2f}%) {status}")
+        print(f"  {len(explanation['files'])} source file(s):")
+        for file_row in explanation["files"]:
+            contributions = ", ".join(f"{metric['metric']} {file_row[metric['metric']]:.2f}" for metric in explanation["metrics"])
+            print(f"    {file_row['Source File']}: {file_row['Rows']} row(s); {contributions}")
@@ -0,0 +1,169 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrumentation import timed_stage, track_peak_rss
+from .discovery import list_source_files
+from .aggregation import compact_dtypes, summarize_system_data
+from .ingest import read_source_files, read_source_files_incremental, shared_reader_pool
+from .staging import load_partitions, write_lineage_index, write_partitions, write_staging_file
+from .reconcile import process_excel_files
+
+def process_system_data(system_name, config, all_standardized_data, errors=None, report=None):
+    """Processes data for a specific system based on the config.
+
+    Per-file read failures are appended to errors as (file_path, message)
+    instead of being printed. Returns the in-memory summary frame (or None)
+    so reconciliation does not have to re-read the staging artifact. When a
+    report dict is given, stage timings and per-file parse stats go into it.
+    """
+    system_config = config["systems"][system_name]
+    output_filename = system_config["output_filename"]
+    staging_folder = system_config["staging_folder"]
+    root_directory = os.path.join(config["root_directory"], system_name)
+    max_workers = system_config.get("max_workers", config.get("max_workers", 1))
+    discovery_workers = system_config.get("discovery_workers", config.get("discovery_workers", 1))
+    staging_format = system_config.get("staging_format", "xlsx")
+    incremental = system_config.get("incremental", config.get("incremental", False))
+    compact = system_config.get("compact_dtypes", config.get("compact_dtypes", False))
+    if compact:
+        system_config = dict(system_config, compact_dtypes=True)  # Readers categorize the keys of every file
+    staging_store = config.get("staging_store")
+    lineage = [] if system_config.get("lineage", config.get("lineage", False)) else None
+    cache_folder = system_config.get("cache_folder", os.path.join(staging_folder, ".cache"))
+    
+    os.makedirs(staging_folder, exist_ok=True)  # Ensure output directory exists
+    output_file_path = os.path.join(staging_folder, output_filename)
+    
+    file_stats = [] if report is not None else None
+
+    with timed_stage(report, "discovery") as stats:
+        source_files = list_source_files(root_directory, system_config, discovery_workers)
+        stats["files"] = len(source_files)
+    with timed_stage(report, "ingestion") as stats:
+        if incremental:
+            all_data, file_errors = read_source_files_incremental(source_files, system_config, cache_folder, max_workers, file_stats, lineage)
+        else:
+            all_data, file_errors = read_source_files(source_files, system_config, max_workers, file_stats, lineage)  # Store extracted data
+        if file_stats is not None:
+            stats["rows"] = sum(file_stat["rows"] for file_stat in file_stats)
+            stats["bytes_read"] = sum(file_stat["bytes"] for file_stat in file_stats)
+            stats["errors"] = len(file_errors)
+    if errors is not None:
+        errors.extend(file_errors)
+    if report is not None:
+        report["files"] = file_stats
+        report["errors"] = [{"path": file_path, "message": message} for file_path, message in file_errors]
+    
+    if all_data:
+        with timed_stage(report, "aggregation") as stats:
+            summary_df = summarize_system_data(all_data, system_config)
+            if compact:
+                summary_df = compact_dtypes(summary_df)
+            stats["rows"] = len(summary_df)
+
+        with timed_stage(report, "staging"):
+            staged_path = write_staging_file(summary_df, output_file_path, staging_format)
+            print(f"Standardized summary saved at: {staged_path}")
+            if staging_format != "xlsx" and system_config.get("export_xlsx", False):
+                summary_df.to_excel(output_file_path, index=False, engine='openpyxl')  # Optional human-facing copy
+                print(f"Standardized summary exported to: {output_file_path}")
+            if staging_store:
+                written = write_partitions(summary_df, os.path.join(staging_store, system_name), system_config)
+                print(f"Staging store for {system_name}: {written} period partition(s) updated")
+            if lineage is not None:
+                lineage_path = write_lineage_index(lineage, system_config)
+                print(f"Lineage index saved at: {lineage_path}")
+        
+        all_standardized_data.append(summary_df)  # Store summary for final combined output
+        return summary_df  # Hand the frame straight to reconciliation
+    else:
+        print("No data extracted.")
+        return None
+
+def reconcile_references(summary_df, references, config, report=None):
+    """Reconciles one summary against every reference; returns {label: reconciled frame}.
+
+    references maps a label to a frame from load_reference. The summary is
+    built once and only the join and comparison run per reference. With
+    several references, each one's timings go into
+    report["references"][label].
+    """
+    reconciled_by_reference = {}
+    for label, reference_df in references.items():
+        reference_report = report
+        if report is not None and len(references) > 1:
+            reference_report = report.setdefault("references", {}).setdefault(label, {})
+        reconciled_df = process_excel_files(summary_df, reference_df, config, reference_report)
+        if reconciled_df is not None:
+            reconciled_by_reference[label] = reconciled_df
+    return reconciled_by_reference
+
+def run_system_pipeline(system_name, config, references):
+    """Standardizes one system once and reconciles it against every reference.
+
+    references maps a label to a loaded reference frame; an empty dict only
+    standardizes. Returns (standardized_data, reconciled_by_reference,
+    errors, report) so results can be merged by the caller in config order.
+    report holds the system's stage timings, per-file parse stats, errors
+    and sampled peak RSS.
+    """
+    standardized_data = []
+    errors = []
+    reconciled_by_reference = {}
+    report = {}
+
+    start = time.perf_counter()
+    with track_peak_rss() as memory:
+        summary_df = process_system_data(system_name, config, standardized_data, errors, report)
+        if summary_df is not None:
+            reconciled_by_reference = reconcile_references(summary_df, references, config, report)
+    report["seconds"] = round(time.perf_counter() - start, 6)
+    report["peak_rss_bytes"] = memory["peak_rss_bytes"]
+    return standardized_data, reconciled_by_reference, errors, report
+
+def run_all_systems(config, references):
+    """Runs every configured system pipeline, concurrently when system_workers > 1.
+
+    Each system runs on its own scheduler thread, so one slow system does
+    not hold up the others. File parsing for all of them goes to one shared
+    process pool, sized by the largest max_workers any system uses, so the
+    worker budget does not multiply with system_workers. Results are
+    returned in config order. Systems run one after another while cProfile
+    is on, since it only sees the thread it was enabled on.
+    """
+    system_names = list(config["systems"])
+    system_workers = config.get("system_workers", 1)
+    if config.get("profile", {}).get("cprofile"):
+        system_workers = 1
+
+    if system_workers and system_workers > 1 and len(system_names) > 1:
+        max_workers = max(config["systems"][system_name].get("max_workers", config.get("max_workers", 1)) for system_name in system_names)
+        with shared_reader_pool(max_workers), ThreadPoolExecutor(max_workers=min(system_workers, len(system_names))) as executor:
+            futures = [executor.submit(run_system_pipeline, system_name, config, references) for system_name in system_names]
+            return [future.result() for future in futures]
+    return [run_system_pipeline(system_name, config, references) for system_name in system_names]
+
+def reconcile_stored_periods(config, references, period_range, reports=None):
+    """Reconciles the staging_store partitions within period_range, without re-reading sources.
+
+    Returns (standardized_by_system, reconciled_by_reference) for the
+    systems that have partitions in the range, with reconciled_by_reference
+    as {label: {system: frame}}. When a reports dict is given, each system's
+    load and reconciliation timings go into reports[system_name].
+    """
+    standardized_by_system = {}
+    reconciled_by_reference = {label: {} for label in references}
+    for system_name in config["systems"]:
+        report = {} if reports is not None else None
+        with timed_stage(report, "partitions") as stats:
+            summary_df = load_partitions(os.path.join(config["staging_store"], system_name), period_range)
+            stats["rows"] = 0 if summary_df is None else len(summary_df)
+        if reports is not None:
+            reports[system_name] = report
+        if summary_df is None:
+            continue
+        standardized_by_system[system_name] = summary_df
+        for label, reconciled_df in reconcile_references(summary_df, references, config, report).items():
+            reconciled_by_reference[label][system_name] = reconciled_df
+    return standardized_by_system, reconciled_by_reference
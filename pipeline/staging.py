@@ -0,0 +1,161 @@
+import os
+import json
+import hashlib
+import pandas as pd
+
+from .aggregation import summary_keys
+
+STAGING_EXTENSIONS = {"xlsx": ".xlsx", "parquet": ".parquet", "feather": ".feather", "arrow": ".arrow"}
+
+def staging_path(output_file_path, staging_format):
+    """Returns output_file_path with the extension used by the given staging format."""
+    return os.path.splitext(output_file_path)[0] + STAGING_EXTENSIONS[staging_format]
+
+def write_staging_file(df, output_file_path, staging_format="xlsx"):
+    """Writes a staging artifact in the requested format and returns the path written.
+
+    Columnar formats need pyarrow; without it the artifact falls back to xlsx.
+    """
+    if staging_format not in STAGING_EXTENSIONS:
+        raise ValueError(f"Unknown staging_format '{staging_format}', expected one of {list(STAGING_EXTENSIONS)}")
+
+    path = staging_path(output_file_path, staging_format)
+    try:
+        if staging_format == "parquet":
+            df.to_parquet(path, index=False)
+            return path
+        if staging_format in ("feather", "arrow"):
+            df.reset_index(drop=True).to_feather(path)
+            return path
+    except ImportError as e:
+        print(f"Warning: {staging_format} staging unavailable ({e}), falling back to xlsx")
+        path = staging_path(output_file_path, "xlsx")
+
+    df.to_excel(path, index=False, engine='openpyxl')
+    return path
+
+def read_staging_file(path):
+    """Reads a staging artifact written by write_staging_file."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        return pd.read_parquet(path)
+    if extension in (".feather", ".arrow"):
+        return pd.read_feather(path)
+    return pd.read_excel(path)
+
+PARTITION_INDEX = "index.json"
+
+def period_month(label, system_config):
+    """Returns the "YYYY-MM" month a period label falls in, or None if it cannot be parsed."""
+    if label is None:
+        return None
+    if "date_format" in system_config:
+        parsed = pd.to_datetime(label, format=system_config["date_format"], errors='coerce')
+    else:
+        parsed = pd.to_datetime(str(label).replace("_", "-"), errors='coerce')
+    return None if pd.isna(parsed) else parsed.strftime("%Y-%m")
+
+def parse_period_range(text):
+    """Parses "2025-01" or "2025-01:2025-03" (either end may be left open) into a (start, end) month pair."""
+    start, _, end = text.partition(":") if ":" in text else (text, ":", text)
+    return tuple(str(pd.Period(value.strip(), freq="M")) if value.strip() else None for value in (start, end))
+
+def in_period_range(month, period_range):
+    """True when month ("YYYY-MM") lies within period_range; unparsed months only match no range."""
+    if period_range is None:
+        return True
+    start, end = period_range
+    return month is not None and (start is None or month >= start) and (end is None or month <= end)
+
+def load_partition_index(store_folder):
+    """Loads a system's partition index ({"partitions": [...]}), or an empty one."""
+    index_path = os.path.join(store_folder, PARTITION_INDEX)
+    if not os.path.exists(index_path):
+        return {"partitions": []}
+    with open(index_path, "r") as file:
+        return json.load(file)
+
+def save_partition_index(store_folder, index):
+    """Atomically writes a system's partition index."""
+    index_path = os.path.join(store_folder, PARTITION_INDEX)
+    with open(index_path + ".tmp", "w") as file:
+        json.dump(index, file, indent=4)
+    os.replace(index_path + ".tmp", index_path)
+
+def _partition_hash(df):
+    """Hashes a partition's columns, dtypes and values."""
+    digest = hashlib.sha256(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def write_partitions(summary_df, store_folder, system_config):
+    """Writes a system summary into store_folder as one staging file per period.
+
+    Each partition's file, row count, "YYYY-MM" month and content hash go
+    into the folder's index.json. Partitions whose rows are unchanged are
+    not rewritten, and partitions for periods no longer in the summary are
+    removed. Returns the number of partitions written.
+    """
+    os.makedirs(store_folder, exist_ok=True)
+    staging_format = system_config.get("staging_format", "xlsx")
+    previous = {entry["period"]: entry for entry in load_partition_index(store_folder)["partitions"]}
+    date_column = next((col for col in ("Date Post", "Month") if col in summary_df.columns), None)
+    if date_column is None:
+        groups = [(None, summary_df)]
+    else:
+        groups = summary_df.groupby(date_column, dropna=False, sort=True, observed=True)
+
+    partitions = []
+    written = 0
+    for label, part in groups:
+        period = None if pd.isna(label) else str(label)
+        content_hash = _partition_hash(part)
+        entry = previous.pop(period, None)
+        if entry is None or entry["content_hash"] != content_hash or not os.path.exists(os.path.join(store_folder, entry["file"])):
+            name = "period=" + ("none" if period is None else "".join(char if char.isalnum() or char in "-_" else "_" for char in period))
+            path = write_staging_file(part.reset_index(drop=True), os.path.join(store_folder, name + ".xlsx"), staging_format)
+            if entry is not None and entry["file"] != os.path.basename(path) and os.path.exists(os.path.join(store_folder, entry["file"])):
+                os.remove(os.path.join(store_folder, entry["file"]))  # Same period, previously staged in another format
+            entry = {"period": period, "file": os.path.basename(path), "rows": len(part), "month": period_month(period, system_config), "content_hash": content_hash}
+            written += 1
+        partitions.append(entry)
+
+    for entry in previous.values():
+        stale_path = os.path.join(store_folder, entry["file"])
+        if os.path.exists(stale_path) and entry["file"] not in {kept["file"] for kept in partitions}:
+            os.remove(stale_path)
+    save_partition_index(store_folder, {"date_column": date_column, "partitions": partitions})
+    return written
+
+def load_partitions(store_folder, period_range=None):
+    """Reads only the partitions of store_folder whose month is within period_range.
+
+    Returns the concatenated frame, or None when no partition matches.
+    """
+    index = load_partition_index(store_folder)
+    frames = [
+        read_staging_file(os.path.join(store_folder, entry["file"]))
+        for entry in index["partitions"]
+        if in_period_range(entry["month"], period_range)
+    ]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+def lineage_index_path(system_config):
+    """Returns the base path of a system's lineage index in its staging folder."""
+    base = os.path.splitext(system_config["output_filename"])[0]
+    return os.path.join(system_config["staging_folder"], base + "_lineage.xlsx")
+
+def write_lineage_index(lineage, system_config):
+    """Writes the per-file lineage frames of a system as one staging file and returns its path."""
+    frames = [df for df in lineage if not df.empty]
+    lineage_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=summary_keys(system_config) + ["Source File", "Rows"])
+    return write_staging_file(lineage_df, lineage_index_path(system_config), system_config.get("staging_format", "xlsx"))
+
+def read_lineage_index(system_config):
+    """Reads a system's lineage index, or returns None if none has been written."""
+    base = lineage_index_path(system_config)
+    for staging_format in (system_config.get("staging_format", "xlsx"), "xlsx"):
+        path = staging_path(base, staging_format)
+        if os.path.exists(path):
+            return read_staging_file(path)
+    return None
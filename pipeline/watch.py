@@ -0,0 +1,270 @@
+import os
+import time
+import threading
+import pandas as pd
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional: watch mode polls the tree without it
+    Observer = None
+
+from .discovery import list_source_files, source_stat
+from .aggregation import summarize_system_data, summary_keys
+from .ingest import iter_source_results
+from .staging import write_lineage_index, write_partitions, write_staging_file
+from .reconcile import load_reference, process_excel_files
+from .output import write_outputs
+
+def file_signature(file_path):
+    """Returns (size, mtime_ns) for a file, or None if it no longer exists.
+
+    Source files reuse the stat from the latest discovery walk.
+    """
+    try:
+        stat = source_stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def frame_keys(df, keys):
+    """Returns the set of summary keys a frame has rows for, or None if it lacks a key column."""
+    if not set(keys) <= set(df.columns):
+        return None
+    return set(df[keys].dropna().itertuples(index=False, name=None))
+
+def key_mask(df, keys, selected):
+    """Returns a boolean mask of the rows of df whose summary key is in selected."""
+    return pd.MultiIndex.from_frame(df[keys]).isin(list(selected))
+
+def rebuild_watch_state(state, config, reference_df):
+    """Recomputes a watched system's summary and reconciliation from its cached frames."""
+    system_config = config["systems"][state["system_name"]]
+    frames = list(state["frames"].values())
+    state["summary"] = summarize_system_data(frames, system_config) if frames else None
+    state["reconciled"] = process_excel_files(state["summary"], reference_df, config) if state["summary"] is not None else None
+
+def load_watch_state(system_name, config, reference_df):
+    """Reads every source file of a system and keeps the per-file frames for watch mode.
+
+    The state holds each file's frame (a partial aggregate with
+    streaming_aggregation), the summary keys it contributes to, its
+    (size, mtime) signature, its lineage rows when lineage is enabled, and
+    the current summary and reconciled frames.
+    """
+    system_config = config["systems"][system_name]
+    root_directory = os.path.join(config["root_directory"], system_name)
+    max_workers = system_config.get("max_workers", config.get("max_workers", 1))
+    discovery_workers = system_config.get("discovery_workers", config.get("discovery_workers", 1))
+    keys = summary_keys(system_config)
+
+    source_files = list_source_files(root_directory, system_config, discovery_workers)
+    lineage = system_config.get("lineage", config.get("lineage", False))
+    state = {"system_name": system_name, "frames": {}, "keys": {}, "lineage": {} if lineage else None, "summary": None, "reconciled": None}
+    state["signatures"] = {file_path: file_signature(file_path) for _, file_path in source_files}  # Taken before reading, so a write during the read is seen next poll
+    for (folder_path, file_path), (df, error, stats) in zip(source_files, iter_source_results(source_files, system_config, max_workers, lineage)):
+        if error is not None:
+            print(f"Warning: {file_path}: {error}")
+        else:
+            state["frames"][file_path] = df
+            state["keys"][file_path] = frame_keys(df, keys)
+            if lineage:
+                state["lineage"][file_path] = stats["lineage"]
+    rebuild_watch_state(state, config, reference_df)
+    return state
+
+def refresh_watch_keys(state, config, reference_df, affected):
+    """Recomputes the summary and reconciled rows for the affected keys only.
+
+    Rows for other keys are kept as they are; with fuzzy_match enabled the
+    whole refreshed summary is re-reconciled instead. Falls back to a full
+    rebuild from the cached frames when the system has no keyed summary, or
+    when the reconciled frame carries the keys under join suffixes.
+    """
+    system_config = config["systems"][state["system_name"]]
+    keys = summary_keys(system_config)
+    summary_df = state["summary"]
+    reconciled_df = state["reconciled"]
+    if summary_df is None or reconciled_df is None or not set(keys) <= set(summary_df.columns) or not set(keys) <= set(reconciled_df.columns) or None in state["keys"].values():
+        rebuild_watch_state(state, config, reference_df)
+        return
+
+    contributing = [df[key_mask(df, keys, affected)] for file_path, df in state["frames"].items() if state["keys"][file_path] & affected]
+    summary_df = summary_df[~key_mask(summary_df, keys, affected)]
+    new_summary = summarize_system_data(contributing, system_config) if contributing else None
+    if new_summary is not None:
+        summary_df = pd.concat([summary_df, new_summary], ignore_index=True)
+    state["summary"] = summary_df.sort_values(keys, kind="stable", ignore_index=True)  # Same order as a full groupby
+
+    if config.get("fuzzy_match", {}).get("enabled", False):
+        # Fuzzy matches are assigned one to one across the whole system, so
+        # the affected keys cannot be reconciled on their own
+        state["reconciled"] = process_excel_files(state["summary"], reference_df, config)
+        return
+    reconciled_df = reconciled_df[~key_mask(reconciled_df, keys, affected)]
+    if new_summary is not None:
+        reconciled_df = pd.concat([reconciled_df, process_excel_files(new_summary, reference_df, config)], ignore_index=True)
+    state["reconciled"] = reconciled_df.sort_values(keys, kind="stable", ignore_index=True)
+
+def apply_source_changes(state, config, reference_df, source_files, changed):
+    """Re-reads the changed files of a watched system and refreshes the keys they touch.
+
+    source_files is the system's current listing; changed files missing from
+    it were removed. A file that no longer reads drops out, as it would in
+    a fresh run. Returns the number of affected keys, or None when the
+    system had to be rebuilt in full.
+    """
+    system_config = config["systems"][state["system_name"]]
+    max_workers = system_config.get("max_workers", config.get("max_workers", 1))
+    keys = summary_keys(system_config)
+    to_read = [(folder_path, file_path) for folder_path, file_path in source_files if file_path in changed]
+
+    affected = set()
+    full_rebuild = False
+    for file_path in changed:
+        old_keys = state["keys"].pop(file_path, set())
+        state["frames"].pop(file_path, None)
+        if state["lineage"] is not None:
+            state["lineage"].pop(file_path, None)
+        if old_keys is None:
+            full_rebuild = True
+        else:
+            affected |= old_keys
+
+    new_frames = {}
+    for (folder_path, file_path), (df, error, stats) in zip(to_read, iter_source_results(to_read, system_config, max_workers, state["lineage"] is not None)):
+        if error is not None:
+            print(f"Warning: {file_path}: {error}")
+            continue
+        new_frames[file_path] = df
+        if state["lineage"] is not None:
+            state["lineage"][file_path] = stats["lineage"]
+        state["keys"][file_path] = frame_keys(df, keys)
+        if state["keys"][file_path] is None:
+            full_rebuild = True
+        else:
+            affected |= state["keys"][file_path]
+
+    frames = {**state["frames"], **new_frames}
+    state["frames"] = {file_path: frames[file_path] for _, file_path in source_files if file_path in frames}  # Listing order, as in a fresh run
+
+    if full_rebuild:
+        rebuild_watch_state(state, config, reference_df)
+        return None
+    refresh_watch_keys(state, config, reference_df, affected)
+    return len(affected)
+
+def poll_source_changes(state, config, settle_seconds=2):
+    """Returns (source_files, changed paths) for a watched system since the last poll.
+
+    Files modified within settle_seconds are left for a later poll so a
+    half-written export is not read.
+    """
+    system_config = config["systems"][state["system_name"]]
+    root_directory = os.path.join(config["root_directory"], state["system_name"])
+    discovery_workers = system_config.get("discovery_workers", config.get("discovery_workers", 1))
+    source_files = list_source_files(root_directory, system_config, discovery_workers)
+    now = time.time()
+
+    changed = set()
+    for _, file_path in source_files:
+        signature = file_signature(file_path)
+        if signature is None or signature == state["signatures"].get(file_path):
+            continue
+        if now - signature[1] / 1e9 >= settle_seconds:
+            state["signatures"][file_path] = signature
+            changed.add(file_path)
+    listed = {file_path for _, file_path in source_files}
+    for file_path in list(state["signatures"]):
+        if file_path not in listed:
+            del state["signatures"][file_path]
+            changed.add(file_path)
+    return source_files, changed
+
+def start_watch_observer(root_directory, wake):
+    """Starts a watchdog observer that sets wake on any change under root_directory.
+
+    Returns None when watchdog is not installed; watch mode then relies on
+    polling alone.
+    """
+    if Observer is None:
+        return None
+
+    class WakeHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            wake.set()
+
+    observer = Observer()
+    observer.schedule(WakeHandler(), root_directory, recursive=True)
+    observer.start()
+    return observer
+
+def write_watch_outputs(states, config):
+    """Writes staging files and the combined outputs from the watched systems' frames."""
+    for system_name, state in states.items():
+        system_config = config["systems"][system_name]
+        if state["summary"] is not None:
+            os.makedirs(system_config["staging_folder"], exist_ok=True)
+            output_file_path = os.path.join(system_config["staging_folder"], system_config["output_filename"])
+            write_staging_file(state["summary"], output_file_path, system_config.get("staging_format", "xlsx"))
+            if config.get("staging_store"):
+                write_partitions(state["summary"], os.path.join(config["staging_store"], system_name), system_config)
+            if state["lineage"] is not None:
+                write_lineage_index([state["lineage"][file_path] for file_path in state["frames"] if file_path in state["lineage"]], system_config)
+    standardized_by_system = {system_name: state["summary"] for system_name, state in states.items() if state["summary"] is not None}
+    reconciled_by_system = {system_name: state["reconciled"] for system_name, state in states.items() if state["reconciled"] is not None}
+    write_outputs(standardized_by_system, {"reference": reconciled_by_system}, config.get("output", {}))
+
+def watch_sources(config, reference_file, interval=5, settle_seconds=2, max_polls=None):
+    """Keeps the outputs current as source files are added, changed or removed.
+
+    Every system is read once and its per-file frames are kept in memory.
+    Each poll (every interval seconds, or sooner on a watchdog event)
+    re-reads only changed files and recomputes only the (Practitioner Name,
+    Month) keys they contribute to, reconciling those keys against the
+    already-loaded reference. A changed reference file is reloaded and every
+    summary re-reconciled. Runs until interrupted, or for max_polls polls.
+    """
+    cache_folder = config.get("reference_cache_folder")
+    reference_df = load_reference(reference_file, cache_folder)
+    reference_signature = file_signature(reference_file)
+    states = {system_name: load_watch_state(system_name, config, reference_df) for system_name in config["systems"]}
+    write_watch_outputs(states, config)
+
+    wake = threading.Event()
+    observer = start_watch_observer(config["root_directory"], wake)
+    print(f"Watching {config['root_directory']} ({'file events' if observer is not None else 'polling'} every {interval}s); press Ctrl+C to stop")
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            wake.wait(interval)
+            wake.clear()
+            polls += 1
+            updated = False
+
+            signature = file_signature(reference_file)
+            if signature is not None and signature != reference_signature and time.time() - signature[1] / 1e9 >= settle_seconds:
+                reference_signature = signature
+                reference_df = load_reference(reference_file, cache_folder)
+                for state in states.values():
+                    if state["summary"] is not None:
+                        state["reconciled"] = process_excel_files(state["summary"], reference_df, config)
+                print(f"Reference {reference_file} changed, all systems re-reconciled")
+                updated = True
+
+            for system_name, state in states.items():
+                source_files, changed = poll_source_changes(state, config, settle_seconds)
+                if changed:
+                    affected = apply_source_changes(state, config, reference_df, source_files, changed)
+                    scope = "full rebuild" if affected is None else f"{affected} practitioner-month key(s)"
+                    print(f"{system_name}: {len(changed)} changed file(s), {scope} refreshed")
+                    updated = True
+
+            if updated:
+                write_watch_outputs(states, config)
+    except KeyboardInterrupt:
+        print("Watch stopped.")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
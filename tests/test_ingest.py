@@ -0,0 +1,124 @@
+import os
+
+import pandas as pd
+import pytest
+
+from pipeline.aggregation import combine_partials, partial_aggregate, summarize_system_data
+from pipeline.discovery import list_source_files
+from pipeline.ingest import load_manifest, read_source_files, read_source_files_incremental
+
+SYSTEM_CONFIG = {
+    "columns": {"Date": "Month", "Charges": "MTDcharges"},
+    "date_format": "%Y-%m",
+    "add_columns": {"Practitioner Name": "folder_name"},
+}
+
+def write_source(root, practitioner, name, rows):
+    """Writes a csv export for a practitioner and returns its path."""
+    folder = os.path.join(root, practitioner)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name)
+    pd.DataFrame(rows, columns=["Date", "Charges"]).to_csv(path, index=False)
+    return path
+
+def read_incremental(root, cache_folder, system_config=SYSTEM_CONFIG):
+    """Runs an incremental read of root; returns (frames, errors, paths read from source)."""
+    file_stats = []
+    frames, errors = read_source_files_incremental(list_source_files(root, system_config), system_config, cache_folder, 1, file_stats)
+    return frames, errors, sorted(os.path.basename(stats["path"]) for stats in file_stats if not stats.get("cached"))
+
+def test_incremental_reuses_unchanged_files_and_rereads_changed_ones(tmp_path):
+    root, cache_folder = str(tmp_path / "src"), str(tmp_path / "cache")
+    write_source(root, "Dr A", "a.csv", [["2025-01-05", 1.0]])
+    changed = write_source(root, "Dr B", "b.csv", [["2025-01-06", 2.0]])
+    first, _, read = read_incremental(root, cache_folder)
+    assert read == ["a.csv", "b.csv"]
+
+    _, _, read = read_incremental(root, cache_folder)
+    assert read == []
+
+    pd.DataFrame([["2025-01-06", 3.0, "x"]], columns=["Date", "Charges", "Extra"]).to_csv(changed, index=False)  # New size
+    frames, errors, read = read_incremental(root, cache_folder)
+    assert read == ["b.csv"] and errors == []
+    assert pd.concat(frames)["MTDcharges"].tolist() == [1.0, 3.0]
+
+def test_incremental_config_change_invalidates_the_cache(tmp_path):
+    root, cache_folder = str(tmp_path / "src"), str(tmp_path / "cache")
+    write_source(root, "Dr A", "a.csv", [["05/01/2025", 1.0]])
+    frames, _, _ = read_incremental(root, cache_folder, dict(SYSTEM_CONFIG, input_date_formats="%m/%d/%Y"))
+    assert frames[0]["Month"].tolist() == ["2025-05"]
+
+    frames, _, read = read_incremental(root, cache_folder, dict(SYSTEM_CONFIG, input_date_formats="%d/%m/%Y"))
+    assert read == ["a.csv"]
+    assert frames[0]["Month"].tolist() == ["2025-01"]
+
+def test_incremental_drops_removed_and_failing_files(tmp_path):
+    root, cache_folder = str(tmp_path / "src"), str(tmp_path / "cache")
+    kept = write_source(root, "Dr A", "a.csv", [["2025-01-05", 1.0]])
+    removed = write_source(root, "Dr B", "b.csv", [["2025-01-06", 2.0]])
+    broken = write_source(root, "Dr C", "c.csv", [["2025-01-07", 3.0]])
+    read_incremental(root, cache_folder)
+    assert len([name for name in os.listdir(cache_folder) if name.endswith(".pkl")]) == 3
+
+    os.remove(removed)
+    with open(broken, "w") as file:
+        file.write('"unterminated\n')
+    frames, errors, _ = read_incremental(root, cache_folder)
+    assert [path for path, _ in errors] == [broken]
+    assert list(load_manifest(cache_folder)) == [kept]
+    assert len([name for name in os.listdir(cache_folder) if name.endswith(".pkl")]) == 1
+    assert pd.concat(frames)["MTDcharges"].tolist() == [1.0]
+
+STREAMING_FILES = [
+    pd.DataFrame({"Practitioner Name": ["A", "A", "B"], "Month": ["2025-01", "2025-02", "2025-01"], "Charges": [1.0, 2.0, 3.0], "Visits": [1, 2, 3]}),
+    pd.DataFrame({"Practitioner Name": ["A", "B"], "Month": ["2025-01", "2025-01"], "Charges": [4.0, 5.0], "Visits": [4, None]}),
+]
+
+@pytest.mark.parametrize("aggregate_functions", [
+    {"Charges": "sum", "Visits": "mean"},
+    {"Charges": "min", "Visits": "max"},
+    {"Charges": "count", "Visits": "sum"},
+])
+def test_streaming_partials_match_the_in_memory_summary(aggregate_functions):
+    system_config = {"columns": {"Date": "Month", "Charges": "Charges", "Visits": "Visits"}, "aggregate_functions": aggregate_functions}
+    expected = summarize_system_data([df.copy() for df in STREAMING_FILES], system_config)
+
+    streaming_config = dict(system_config, streaming_aggregation=True)
+    running = []
+    for df in STREAMING_FILES:  # Folded one file at a time, as read_source_files does
+        running = [combine_partials(running + [partial_aggregate(df.copy(), streaming_config)], streaming_config)]
+    actual = summarize_system_data(running, streaming_config)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+def test_streaming_rejects_aggregations_it_cannot_merge():
+    system_config = {"columns": {"Date": "Month"}, "aggregate_functions": {"Charges": "median"}, "streaming_aggregation": True}
+    with pytest.raises(ValueError, match="cannot be streamed"):
+        partial_aggregate(STREAMING_FILES[0].copy(), system_config)
+
+def test_streaming_read_matches_a_full_read(tmp_path):
+    root = str(tmp_path / "src")
+    write_source(root, "Dr A", "a.csv", [["2025-01-05", 1.0], ["2025-02-05", 2.0]])
+    write_source(root, "Dr A", "b.csv", [["2025-01-20", 3.0]])
+    write_source(root, "Dr B", "c.csv", [["2025-01-06", 4.0]])
+    source_files = list_source_files(root, SYSTEM_CONFIG)
+    frames, _ = read_source_files(source_files, SYSTEM_CONFIG)
+    streaming_config = dict(SYSTEM_CONFIG, streaming_aggregation=True)
+    partials, _ = read_source_files(source_files, streaming_config)
+    assert len(partials) == 1  # One running partial, sized by the number of keys
+    expected = summarize_system_data(frames, SYSTEM_CONFIG)
+    actual = summarize_system_data(partials, streaming_config)
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False)
+
+def test_compact_dtypes_categorizes_keys_at_read_time(tmp_path):
+    root = str(tmp_path / "src")
+    write_source(root, "Dr B", "a.csv", [["2025-02-05", 1.0], ["2025-01-05", 2.0]])
+    write_source(root, "Dr A", "b.csv", [["2025-01-20", 3.0]])
+    source_files = list_source_files(root, SYSTEM_CONFIG)
+    compact_config = dict(SYSTEM_CONFIG, compact_dtypes=True)
+    frames, _ = read_source_files(source_files, compact_config)
+    assert all(isinstance(df["Practitioner Name"].dtype, pd.CategoricalDtype) for df in frames)
+
+    expected = summarize_system_data(read_source_files(source_files, SYSTEM_CONFIG)[0], SYSTEM_CONFIG)
+    actual = summarize_system_data(frames, compact_config)
+    assert isinstance(actual["Month"].dtype, pd.CategoricalDtype)  # Categories differ per file; the concat keeps them
+    pd.testing.assert_frame_equal(actual.astype({"Practitioner Name": object, "Month": object}), expected.astype({"Practitioner Name": object, "Month": object}))
@@ -0,0 +1,92 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from pipeline.ingest import read_source_file
+from pipeline.readers import apply_filters, compile_filters, normalize_dates, read_projected_xlsx
+
+def test_normalize_dates_keeps_datetime_cells_with_declared_formats():
+    values = pd.Series([datetime.datetime(2025, 1, 5), "01/02/2025", None], dtype=object)
+    system_config = {"date_format": "%Y-%m", "input_date_formats": ["%d/%m/%Y"]}
+    assert normalize_dates(values, system_config, replace_underscores=True).tolist()[:2] == ["2025-01", "2025-02"]
+
+@pytest.mark.filterwarnings("ignore::UserWarning")  # pandas warns while inferring formats
+def test_normalize_dates_replaces_underscores_in_strings():
+    values = pd.Series(["January_2025", datetime.datetime(2025, 2, 1)], dtype=object)
+    assert normalize_dates(values, {"date_format": "%Y-%m"}, replace_underscores=True).tolist() == ["2025-01", "2025-02"]
+
+@pytest.mark.filterwarnings("ignore::UserWarning")  # pandas warns while inferring formats
+def test_normalize_dates_infers_per_file_without_declared_formats():
+    system_config = {"date_format": "%Y-%m"}
+    normalize_dates(pd.Series(["13/01/2025"]), system_config)
+    # An earlier file's values must not change how this file's format is inferred
+    assert normalize_dates(pd.Series(["2025-02-03", "13/01/2025"]), system_config).tolist()[0] == "2025-02"
+    assert pd.isna(normalize_dates(pd.Series(["2025-02-03", "13/01/2025"]), system_config).tolist()[1])
+
+def test_read_source_file_normalizes_mapping_keys(tmp_path):
+    source_file = tmp_path / "Dr A" / "export.csv"
+    source_file.parent.mkdir()
+    source_file.write_text("Ledger Date By Month,Charge\n2025-01-05,1.5\n,2.0\n")
+    system_config = {
+        "columns": {"Ledger Date by Month": "Month", "Charge": "Charge"},
+        "date_format": "%Y-%m",
+        "filter_conditions": {"Ledger Date By Month": "not_empty"},
+    }
+    df = read_source_file(str(source_file.parent), str(source_file), system_config)
+    assert df.to_dict("records") == [{"Month": "2025-01", "Charge": 1.5}]
+
+FILTER_FRAME = pd.DataFrame({
+    "Provider": ["A", "B", " ", "D", "C"],
+    "Amount": [5.0, 15.0, 25.0, 35.0, None],
+    "Code": ["x", None, "y", "", "z"],
+    "Posted": ["2025-01-05", "2025-02-10", "2025-03-15", "bad", "2025-01-31"],
+})
+
+def filtered_providers(conditions, columns=None):
+    system_config = {"columns": columns or {"Provider": "Practitioner Name"}, "filter_conditions": conditions}
+    return apply_filters(FILTER_FRAME, system_config)["Provider"].tolist()
+
+def test_filter_not_empty():
+    assert filtered_providers({"Provider": "not_empty"}) == ["A", "B", "D", "C"]
+    assert filtered_providers({"Code": "not_empty"}) == ["A", " ", "C"]
+    assert filtered_providers({"Amount": "not_empty"}) == ["A", "B", " ", "D"]
+
+def test_filter_equals_and_in():
+    assert filtered_providers({"Provider": {"equals": "B"}}) == ["B"]
+    assert filtered_providers({"Provider": {"in": ["A", "C"]}}) == ["A", "C"]
+
+def test_filter_range_with_open_bounds():
+    assert filtered_providers({"Amount": {"range": [10, 30]}}) == ["B", " "]
+    assert filtered_providers({"Amount": {"range": [None, 10]}}) == ["A"]
+    assert filtered_providers({"Amount": {"range": [30, None]}}) == ["D"]
+
+def test_filter_date_between():
+    assert filtered_providers({"Posted": {"date_between": ["2025-01-01", "2025-01-31"]}}) == ["A", "C"]
+    assert filtered_providers({"Posted": {"date_between": ["2025-03-01", None]}}) == [" "]
+
+def test_filter_operators_in_one_condition_all_hold():
+    assert filtered_providers({"Amount": {"range": [0, 30], "in": [15.0, 25.0, 35.0]}}) == ["B", " "]
+
+def test_filter_on_mapped_name_reads_the_source_header():
+    columns = {"Provider": "Practitioner Name", "Amount": "MTDcharges"}
+    by_mapped_name = filtered_providers({"MTDcharges": {"range": [10, None]}}, columns)
+    by_source_header = filtered_providers({"amount ": {"range": [10, None]}}, columns)
+    assert by_mapped_name == by_source_header == ["B", " ", "D"]
+
+def test_filter_missing_column_raises():
+    system_config = {"columns": {"Provider": "Practitioner Name"}, "filter_conditions": {"Missing": "not_empty"}}
+    with pytest.raises(ValueError, match="Filter column 'Missing' not found"):
+        apply_filters(FILTER_FRAME, system_config)
+
+def test_filter_unknown_operator_raises():
+    system_config = {"columns": {}, "filter_conditions": {"Provider": {"like": "A"}}}
+    with pytest.raises(ValueError, match="Unknown filter operator 'like'"):
+        compile_filters(system_config)
+
+def test_projected_xlsx_filters_every_chunk(tmp_path):
+    source_file = tmp_path / "export.xlsx"
+    pd.DataFrame({" provider": ["A", "", "B", "", "C"], "Amount": [1, 2, 3, 4, 5], "Other": [0] * 5}).to_excel(source_file, index=False)
+    row_filter = compile_filters({"columns": {"Provider": "Practitioner Name"}, "filter_conditions": {"Provider": "not_empty"}})
+    df = read_projected_xlsx(str(source_file), ["Provider", "Amount"], row_filter, chunk_rows=2)
+    assert df.to_dict("list") == {"Provider": ["A", "B", "C"], "Amount": [1, 3, 5]}
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from pipeline.reconcile import encode_match_keys, fuzzy_match_keys, process_excel_files
+
+FUZZY_CONFIG = {"fuzzy_match": {"enabled": True, "threshold": 0.85}}
+
+def make_summary(names, month="2025-01"):
+    """Returns a summary frame with one row per name, all metrics 1."""
+    return pd.DataFrame({
+        "Practitioner Name": names,
+        "Month": [month] * len(names),
+        "MTDcharges": [1.0] * len(names),
+        "MTDpayments": [1.0] * len(names),
+        "EngageAdjustments": [1.0] * len(names),
+    })
+
+def make_reference(matchkeys, charges=None):
+    """Returns a reference frame indexed on Matchkey, as load_reference builds it."""
+    charges = charges or [1.0] * len(matchkeys)
+    reference_df = pd.DataFrame({
+        "Matchkey": matchkeys,
+        "Engage_Charges": charges,
+        "Engage_Payments": [1.0] * len(matchkeys),
+        "Engage_Adjustments": [1.0] * len(matchkeys),
+    })
+    return reference_df.set_index("Matchkey", drop=False).rename_axis(None)
+
+def test_fuzzy_match_keys_exact_fuzzy_and_unmatched():
+    queries = [("2025-01", "Dr. Jane Doe"), ("2025-01", "Jon Smyth"), ("2025-01", "Someone Else")]
+    candidates = [("2025-01", "Jane Doe MD"), ("2025-01", "John Smyth"), ("2025-02", "Someone Else")]
+    matches = fuzzy_match_keys(queries, candidates)
+    assert matches[0] == (0, 1.0)  # Same name once titles and punctuation are dropped
+    assert matches[1][0] == 1 and 0.85 <= matches[1][1] < 1
+    assert 2 not in matches  # Only a candidate in another period
+
+def test_fuzzy_match_keys_is_one_to_one():
+    queries = [("2025-01", "John Smyth"), ("2025-01", "John Smith")]
+    candidates = [("2025-01", "John Smith")]
+    assert fuzzy_match_keys(queries, candidates) == {1: (0, 1.0)}
+
+def test_process_excel_files_match_types():
+    summary_df = make_summary(["Dr A", "Dr. Bob Smith", "Zed"])
+    reference_df = make_reference(["Dr A_2025-01", "Bob Smith_2025-01"])
+    result_df = process_excel_files(summary_df, reference_df, FUZZY_CONFIG)
+    assert result_df["Match_Type"].tolist() == ["exact", "fuzzy", "unmatched"]
+    assert result_df["Matchkey"].tolist()[:2] == ["Dr A_2025-01", "Bob Smith_2025-01"]
+    assert result_df["Match_Score"].tolist()[0] == 1.0 and np.isnan(result_df["Match_Score"].tolist()[2])
+
+def test_process_excel_files_does_not_fuzzy_match_a_claimed_reference_row():
+    summary_df = make_summary(["Dr A", "Dr. A"])
+    reference_df = make_reference(["Dr A_2025-01"])
+    result_df = process_excel_files(summary_df, reference_df, FUZZY_CONFIG)
+    assert result_df["Match_Type"].tolist() == ["exact", "unmatched"]
+
+def test_process_excel_files_duplicate_matchkeys():
+    summary_df = make_summary(["Dr A", "Dr. Bob Smith"])
+    reference_df = make_reference(["Dr A_2025-01", "Dr A_2025-01", "Bob Smith_2025-01"], charges=[1.0, 5.0, 1.0])
+    result_df = process_excel_files(summary_df, reference_df, FUZZY_CONFIG)
+    assert result_df["Practitioner Name"].tolist() == ["Dr A", "Dr A", "Dr. Bob Smith"]
+    assert result_df["Match_Type"].tolist() == ["exact", "exact", "fuzzy"]
+    assert result_df["Match_Status"].tolist() == ["Match", "Mismatch", "Match"]
+
+def test_process_excel_files_keeps_merge_suffixes():
+    summary_df = make_summary(["Dr A"])
+    reference_df = make_reference(["Dr A_2025-01"]).assign(**{"Practitioner Name": ["Dr A"]})
+    result_df = process_excel_files(summary_df, reference_df, FUZZY_CONFIG)
+    assert {"Practitioner Name_x", "Practitioner Name_y"} <= set(result_df.columns)
+    assert result_df["Match_Type"].tolist() == ["exact"]
+
+def test_encode_match_keys_names_with_underscores():
+    practitioners = pd.Series(["Smith_Jones", "Smith", "Smith_Jones"])
+    periods = pd.Series(["January_2025", "Jones_January_2025", "2025"])
+    matchkeys = pd.Series(["Smith_Jones_January_2025", "Smith_Jones_2025", "Smith_Jones_February_2025"])
+    summary_ids, reference_ids, concat_keys = encode_match_keys(practitioners, periods, matchkeys)
+    assert concat_keys.tolist() == ["Smith_Jones_January_2025", "Smith_Jones_January_2025", "Smith_Jones_2025"]
+    # Rows join when the key strings are equal, however the key splits into name and period
+    assert summary_ids[0] == summary_ids[1] == reference_ids[0]
+    assert reference_ids[1] == summary_ids[2]
+    assert reference_ids[2] == -1
+
+def test_process_excel_files_names_with_underscores():
+    summary_df = make_summary(["Smith_Jones", "Jane_Doe"], month="January_2025")
+    reference_df = make_reference(["Smith_Jones_January_2025", "Jane Doe_January_2025"])
+    result_df = process_excel_files(summary_df, reference_df, FUZZY_CONFIG)
+    assert result_df["Match_Type"].tolist() == ["exact", "fuzzy"]
+    assert result_df["Matchkey"].tolist() == ["Smith_Jones_January_2025", "Jane Doe_January_2025"]
+
+def test_process_excel_files_inner_join_exact_match():
+    summary_df = make_summary(["Dr A", "Dr B", "Nobody"])
+    reference_df = make_reference(["Dr A_2025-01", "Dr B_2025-01"], charges=[1.0, 1.001])
+    config = {"percentage_threshold": 25, "reconcile_join": "inner", "exact_match": True, "reconciled_columns": ["Concat_Key", "Match_Status"]}
+    result_df = process_excel_files(summary_df, reference_df, config)
+    assert result_df.columns.tolist() == ["Concat_Key", "Match_Status"]
+    assert result_df.values.tolist() == [["Dr A_2025-01", "Match"], ["Dr B_2025-01", "Mismatch"]]
+
+def test_compare_metrics_row_without_reference_is_mismatch():
+    summary_df = make_summary(["Dr A", "Zed"])
+    reference_df = make_reference(["Dr A_2025-01"])
+    result_df = process_excel_files(summary_df, reference_df, {"percentage_threshold": 25})
+    assert result_df["Match_Status"].tolist() == ["Match", "Mismatch"]
+    assert result_df["Mismatch_Mask"].tolist() == [0, 0b111]
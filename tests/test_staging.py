@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+
+from pipeline.staging import load_partition_index, load_partitions, parse_period_range, write_partitions
+
+SYSTEM_CONFIG = {"columns": {"Date": "Month"}, "date_format": "%B_%Y"}
+
+def make_summary(months, charges):
+    """Returns a summary frame with one row per month for practitioner A."""
+    return pd.DataFrame({"Practitioner Name": ["A"] * len(months), "Month": months, "MTDcharges": charges})
+
+def partition_files(store_folder):
+    """Returns the partition file names in store_folder."""
+    return sorted(name for name in os.listdir(store_folder) if name.startswith("period="))
+
+def test_parse_period_range():
+    assert parse_period_range("2025-01") == ("2025-01", "2025-01")
+    assert parse_period_range("2025-01:2025-03") == ("2025-01", "2025-03")
+    assert parse_period_range(":2025-03") == (None, "2025-03")
+
+def test_write_partitions_rewrites_only_changed_periods(tmp_path):
+    store_folder = str(tmp_path / "store")
+    summary_df = make_summary(["January_2025", "February_2025", "March_2025"], [1.0, 2.0, 3.0])
+    assert write_partitions(summary_df, store_folder, SYSTEM_CONFIG) == 3
+    assert write_partitions(summary_df, store_folder, SYSTEM_CONFIG) == 0
+
+    summary_df.loc[1, "MTDcharges"] = 20.0
+    assert write_partitions(summary_df, store_folder, SYSTEM_CONFIG) == 1
+    months = {entry["period"]: entry["month"] for entry in load_partition_index(store_folder)["partitions"]}
+    assert months == {"January_2025": "2025-01", "February_2025": "2025-02", "March_2025": "2025-03"}
+
+def test_write_partitions_removes_periods_no_longer_in_the_summary(tmp_path):
+    store_folder = str(tmp_path / "store")
+    write_partitions(make_summary(["January_2025", "February_2025"], [1.0, 2.0]), store_folder, SYSTEM_CONFIG)
+    write_partitions(make_summary(["January_2025"], [1.0]), store_folder, SYSTEM_CONFIG)
+    assert partition_files(store_folder) == ["period=January_2025.xlsx"]
+    assert [entry["period"] for entry in load_partition_index(store_folder)["partitions"]] == ["January_2025"]
+
+def test_load_partitions_reads_only_the_requested_months(tmp_path):
+    store_folder = str(tmp_path / "store")
+    write_partitions(make_summary(["January_2025", "February_2025", "March_2025"], [1.0, 2.0, 3.0]), store_folder, SYSTEM_CONFIG)
+    assert load_partitions(store_folder, parse_period_range("2025-02:2025-03"))["MTDcharges"].tolist() == [2.0, 3.0]
+    assert load_partitions(store_folder, parse_period_range("2025-01"))["Month"].tolist() == ["January_2025"]
+    assert len(load_partitions(store_folder)) == 3
+    assert load_partitions(store_folder, parse_period_range("2024-12")) is None